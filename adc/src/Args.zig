@@ -12,6 +12,7 @@ allocator: std.mem.Allocator,
 port: Port,
 filename: ?[]const u8,
 scale: f32,
+checked_frames: bool,
 
 pub fn parse(allocator: std.mem.Allocator) !Args {
     var argv = try std.process.argsWithAllocator(allocator);
@@ -22,6 +23,7 @@ pub fn parse(allocator: std.mem.Allocator) !Args {
     var port: ?Port = null;
     var filename: ?[]const u8 = null;
     var scale: f32 = 1;
+    var checked_frames = false;
 
     var state: enum { root, serial, socket, scale } = .root;
     while (argv.next()) |arg| {
@@ -33,6 +35,8 @@ pub fn parse(allocator: std.mem.Allocator) !Args {
                     state = .socket
                 else if (std.mem.eql(u8, arg, "--scale"))
                     state = .scale
+                else if (std.mem.eql(u8, arg, "--checked-frames"))
+                    checked_frames = true
                 else if (filename == null)
                     filename = try allocator.dupe(u8, arg)
                 else {
@@ -63,6 +67,7 @@ pub fn parse(allocator: std.mem.Allocator) !Args {
         .port = port.?,
         .filename = filename,
         .scale = scale,
+        .checked_frames = checked_frames,
     };
 }
 
@@ -74,6 +79,6 @@ pub fn deinit(self: Args) void {
 }
 
 fn usage(argv0: []const u8) noreturn {
-    std.debug.print("usage: {s} {{--serial PORT | --socket SOCKET}}\n", .{argv0});
+    std.debug.print("usage: {s} {{--serial PORT | --socket SOCKET}} [--checked-frames]\n", .{argv0});
     std.process.exit(1);
 }
@@ -8,6 +8,7 @@ const EventThread = @This();
 allocator: Allocator,
 reader: std.io.AnyReader,
 handle: std.posix.fd_t,
+checked_frames: bool,
 thread: std.Thread = undefined,
 mutex: std.Thread.Mutex = .{},
 sema: std.Thread.Semaphore = .{},
@@ -15,12 +16,13 @@ sema: std.Thread.Semaphore = .{},
 evs: std.ArrayList(proto.Event),
 running: std.atomic.Value(bool),
 
-pub fn init(allocator: Allocator, reader: std.io.AnyReader, handle: std.posix.fd_t) !*EventThread {
+pub fn init(allocator: Allocator, reader: std.io.AnyReader, handle: std.posix.fd_t, checked_frames: bool) !*EventThread {
     var et = try allocator.create(EventThread);
     et.* = .{
         .allocator = allocator,
         .reader = reader,
         .handle = handle,
+        .checked_frames = checked_frames,
         .evs = std.ArrayList(proto.Event).init(allocator),
         .running = std.atomic.Value(bool).init(true),
     };
@@ -31,8 +33,17 @@ pub fn init(allocator: Allocator, reader: std.io.AnyReader, handle: std.posix.fd
 fn run(self: *EventThread) void {
     while (self.running.load(.acquire)) {
         // TODO: handle errors & communicate back.
-        const ev = proto.Event.read(self.allocator, self.reader) catch |err| switch (err) {
+        const read_result = if (self.checked_frames)
+            proto.Event.readChecked(self.allocator, self.reader)
+        else
+            proto.Event.read(self.allocator, self.reader);
+        const ev = read_result catch |err| switch (err) {
             error.NotOpenForReading, error.EndOfStream => return,
+            error.ChecksumMismatch => {
+                // The frame was read in full, so the next one can still be.
+                std.debug.print("EventThread: dropped event with bad checksum\n", .{});
+                continue;
+            },
             else => std.debug.panic("EventThread read error: {any}", .{err}),
         };
 
@@ -52,7 +52,15 @@ pub fn main() !void {
         },
     }
 
-    return exe(allocator, args.filename, args.scale, handle, reader, writer);
+    return exe(allocator, args.filename, args.scale, args.checked_frames, handle, reader, writer);
+}
+
+// With --checked-frames, for a core built with -Dchecked-frames.
+fn writeRequest(req: proto.Request, writer: std.io.AnyWriter, checked_frames: bool) !void {
+    if (checked_frames)
+        try req.writeChecked(writer)
+    else
+        try req.write(writer);
 }
 
 // https://retrocomputing.stackexchange.com/a/27805/20624
@@ -66,15 +74,16 @@ fn exe(
     allocator: Allocator,
     filename: ?[]const u8,
     scale: f32,
+    checked_frames: bool,
     handle: std.posix.fd_t,
     reader: std.io.AnyReader,
     writer: std.io.AnyWriter,
 ) !void {
-    var et = try EventThread.init(allocator, reader, handle);
+    var et = try EventThread.init(allocator, reader, handle, checked_frames);
     defer et.deinit();
 
     {
-        try proto.Request.write(.HELLO, writer);
+        try writeRequest(.HELLO, writer, checked_frames);
         const ev = et.readWait();
         defer ev.deinit(allocator);
         std.debug.assert(ev == .VERSION);
@@ -82,7 +91,7 @@ fn exe(
     }
 
     {
-        try proto.Request.write(.MACHINE_INIT, writer);
+        try writeRequest(.MACHINE_INIT, writer, checked_frames);
         const ev = et.readWait();
         defer ev.deinit(allocator);
         std.debug.assert(ev == .OK);
@@ -45,6 +45,10 @@ pub fn build(b: *std.Build) void {
     core.root_module.code_model = .medium;
     core.root_module.single_threaded = true;
     core.entry = .disabled;
+
+    const options = b.addOptions();
+    options.addOption(bool, "checked_frames", b.option(bool, "checked-frames", "Add a CRC-32 trailer to host protocol frames") orelse false);
+    core.root_module.addOptions("options", options);
     const core_inst = b.addInstallArtifact(core, .{ .dest_dir = .{ .override = .bin } });
     b.getInstallStep().dependOn(&core_inst.step);
 
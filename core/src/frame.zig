@@ -2,6 +2,9 @@ const std = @import("std");
 const Allocator = std.mem.Allocator;
 const testing = std.testing;
 
+// CRC-32 of any checked frame followed by its CRC.
+pub const CRC_RESIDUE: u32 = 0x2144df1c;
+
 pub fn write(comptime T: type, writer: anytype, t: T) @TypeOf(writer).Error!void {
     const len = serializeLength(T, t);
     std.debug.assert(len <= std.math.maxInt(u16));
@@ -23,6 +26,74 @@ pub fn read(comptime T: type, allocator: Allocator, reader: anytype) (Allocator.
     return try deserialize(T, allocator, fb.reader());
 }
 
+// Checked frames are followed by the little-endian CRC-32 of the whole frame,
+// length included.
+pub fn writeChecked(comptime T: type, writer: anytype, t: T) @TypeOf(writer).Error!void {
+    var cw = crcWriter(writer);
+    try write(T, cw.writer(), t);
+    try writer.writeInt(u32, cw.crc.final(), .little);
+}
+
+pub fn readChecked(comptime T: type, allocator: Allocator, reader: anytype) (Allocator.Error || @TypeOf(reader).Error || error{ EndOfStream, ChecksumMismatch })!T {
+    var cr = crcReader(reader);
+    const t = try read(T, allocator, cr.reader());
+    errdefer free(T, allocator, t);
+    _ = try cr.reader().readInt(u32, .little);
+    if (cr.crc.final() != CRC_RESIDUE)
+        return error.ChecksumMismatch;
+    return t;
+}
+
+fn CrcWriter(comptime WriterType: type) type {
+    return struct {
+        const Self = @This();
+
+        child: WriterType,
+        crc: std.hash.Crc32 = std.hash.Crc32.init(),
+
+        pub const Writer = std.io.GenericWriter(*Self, WriterType.Error, writeFn);
+
+        fn writeFn(self: *Self, bytes: []const u8) WriterType.Error!usize {
+            const n = try self.child.write(bytes);
+            self.crc.update(bytes[0..n]);
+            return n;
+        }
+
+        pub fn writer(self: *Self) Writer {
+            return .{ .context = self };
+        }
+    };
+}
+
+fn crcWriter(writer: anytype) CrcWriter(@TypeOf(writer)) {
+    return .{ .child = writer };
+}
+
+fn CrcReader(comptime ReaderType: type) type {
+    return struct {
+        const Self = @This();
+
+        child: ReaderType,
+        crc: std.hash.Crc32 = std.hash.Crc32.init(),
+
+        pub const Reader = std.io.GenericReader(*Self, ReaderType.Error, readFn);
+
+        fn readFn(self: *Self, buffer: []u8) ReaderType.Error!usize {
+            const n = try self.child.read(buffer);
+            self.crc.update(buffer[0..n]);
+            return n;
+        }
+
+        pub fn reader(self: *Self) Reader {
+            return .{ .context = self };
+        }
+    };
+}
+
+fn crcReader(reader: anytype) CrcReader(@TypeOf(reader)) {
+    return .{ .child = reader };
+}
+
 fn serialize(comptime T: type, writer: anytype, payload: T) @TypeOf(writer).Error!void {
     switch (@typeInfo(T)) {
         .Union => |u| {
@@ -209,3 +280,19 @@ test "deserializing" {
     try expectDeserialize(TestUnion, "\x02\x03\x00\x00\x00^_^", .{ .B = "^_^" });
     try expectDeserialize(TestUnion, "\x03\x7f\x02\x00\x00\x00\xff\xff\x00", .{ .C = .{ .x = 127, .y = "\xff\xff", .z = .{ .m = false } } });
 }
+
+test "checked roundtrip" {
+    var a = std.ArrayList(u8).init(testing.allocator);
+    defer a.deinit();
+    try writeChecked(TestUnion, a.writer(), .{ .B = "abacus" });
+    try testing.expectEqualStrings("\x0b\x00\x02\x06\x00\x00\x00abacus", a.items[0 .. a.items.len - 4]);
+
+    var fb = std.io.fixedBufferStream(a.items);
+    const t = try readChecked(TestUnion, testing.allocator, fb.reader());
+    defer free(TestUnion, testing.allocator, t);
+    try testing.expectEqualDeep(TestUnion{ .B = "abacus" }, t);
+
+    a.items[8] ^= 0x01;
+    fb = std.io.fixedBufferStream(a.items);
+    try testing.expectError(error.ChecksumMismatch, readChecked(TestUnion, testing.allocator, fb.reader()));
+}
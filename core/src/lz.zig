@@ -0,0 +1,33 @@
+const std = @import("std");
+
+const mmio = @import("./mmio.zig");
+
+// Starts decompressing the image at the given flash address (see
+// soc/avasoc/lz.py), returning its decompressed length. The image is then
+// read from `reader`.
+pub fn open(flash_addr: u24) u32 {
+    mmio.LZ_ADDR.* = flash_addr;
+    return mmio.LZ_LEN.*;
+}
+
+pub const ReadError = error{};
+pub const reader = std.io.GenericReader(void, ReadError, readFn){ .context = {} };
+
+fn readFn(context: void, buffer: []u8) ReadError!usize {
+    // Reads past the end of the image yield zeroes, not EOS; callers know the
+    // length from open().
+    _ = context;
+
+    var i: usize = 0;
+    while (buffer.len - i >= 4) : (i += 4)
+        std.mem.writeInt(u32, buffer[i..][0..4], mmio.LZ_DATA.*, .little);
+    while (i < buffer.len) : (i += 1)
+        buffer[i] = mmio.LZ_DATA_BYTE.*;
+
+    return buffer.len;
+}
+
+test "reader" {
+    // There's no reader to talk to on the host; this only checks readFn builds.
+    _ = &readFn;
+}
@@ -1,3 +1,11 @@
 pub const UART: *volatile u8 = @ptrFromInt(0xf000_0000);
 pub const UART_STATUS: *volatile u16 = @ptrFromInt(0xf000_0000);
 pub const CSR_EXIT: *volatile u8 = @ptrFromInt(0xf001_0000);
+pub const CRC: *volatile u32 = @ptrFromInt(0xf002_0000);
+pub const CRC_DATA: *volatile u32 = @ptrFromInt(0xf002_0004);
+pub const CRC_RX: *volatile u32 = @ptrFromInt(0xf002_0008);
+pub const CRC_TX: *volatile u32 = @ptrFromInt(0xf002_000c);
+pub const LZ_ADDR: *volatile u32 = @ptrFromInt(0xf003_0000);
+pub const LZ_LEN: *volatile u32 = @ptrFromInt(0xf003_0004);
+pub const LZ_DATA: *volatile u32 = @ptrFromInt(0xf003_0008);
+pub const LZ_DATA_BYTE: *volatile u8 = @ptrFromInt(0xf003_0008);
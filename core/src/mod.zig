@@ -4,4 +4,6 @@ pub const proto = @import("proto.zig");
 
 comptime {
     std.testing.refAllDeclsRecursive(proto);
+    // Firmware only, but referenced here so the unit tests type-check it.
+    std.testing.refAllDeclsRecursive(@import("lz.zig"));
 }
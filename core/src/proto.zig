@@ -34,6 +34,14 @@ pub const Request = union(RequestTag) {
     pub fn read(allocator: Allocator, reader: anytype) (Allocator.Error || @TypeOf(reader).Error || error{EndOfStream})!Self {
         return frame.read(Self, allocator, reader);
     }
+
+    pub fn writeChecked(self: Self, writer: anytype) @TypeOf(writer).Error!void {
+        try frame.writeChecked(Self, writer, self);
+    }
+
+    pub fn readChecked(allocator: Allocator, reader: anytype) (Allocator.Error || @TypeOf(reader).Error || error{ EndOfStream, ChecksumMismatch })!Self {
+        return frame.readChecked(Self, allocator, reader);
+    }
 };
 
 pub const EventTag = enum(u8) {
@@ -64,6 +72,14 @@ pub const Event = union(EventTag) {
     pub fn read(allocator: Allocator, reader: anytype) (Allocator.Error || @TypeOf(reader).Error || error{EndOfStream})!Self {
         return frame.read(Self, allocator, reader);
     }
+
+    pub fn writeChecked(self: Self, writer: anytype) @TypeOf(writer).Error!void {
+        try frame.writeChecked(Self, writer, self);
+    }
+
+    pub fn readChecked(allocator: Allocator, reader: anytype) (Allocator.Error || @TypeOf(reader).Error || error{ EndOfStream, ChecksumMismatch })!Self {
+        return frame.readChecked(Self, allocator, reader);
+    }
 };
 
 fn expectRoundtrip(comptime T: type, inp: T) !void {
@@ -84,3 +100,16 @@ test "roundtrips" {
     try expectRoundtrip(Event, .OK);
     try expectRoundtrip(Event, .{ .VERSION = "xyzzy 123!" });
 }
+
+test "checked roundtrips" {
+    var buf = std.ArrayList(u8).init(testing.allocator);
+    defer buf.deinit();
+
+    const inp = Request{ .MACHINE_EXEC = "\xaa\xbb\xcc" };
+    try inp.writeChecked(buf.writer());
+    var fb = std.io.fixedBufferStream(buf.items);
+    const out = try Request.readChecked(testing.allocator, fb.reader());
+    defer out.deinit(testing.allocator);
+
+    try testing.expectEqualDeep(inp, out);
+}
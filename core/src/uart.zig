@@ -1,8 +1,10 @@
 const std = @import("std");
 const Allocator = std.mem.Allocator;
+const options = @import("options");
 const uart = @This();
 
 const proto = @import("./proto.zig");
+const frame = @import("./frame.zig");
 const mmio = @import("./mmio.zig");
 
 pub const WriteError = error{};
@@ -39,10 +41,33 @@ fn readFn(context: void, buffer: []u8) ReadError!usize {
     return i;
 }
 
+// Built with -Dchecked-frames, every frame carries a CRC-32 trailer.
 pub fn readRequest(allocator: Allocator) !proto.Request {
+    if (options.checked_frames)
+        return readRequestChecked(allocator);
     return try proto.Request.read(allocator, reader);
 }
 
 pub fn writeEvent(response: proto.Event) !void {
+    if (options.checked_frames)
+        return writeEventChecked(response);
     try response.write(writer);
 }
+
+// Frames with a CRC-32 trailer. The CRC peripheral snoops the UART, so we
+// needn't compute it ourselves.
+pub fn readRequestChecked(allocator: Allocator) !proto.Request {
+    mmio.CRC_RX.* = 0;
+    const request = try proto.Request.read(allocator, reader);
+    errdefer request.deinit(allocator);
+    _ = try reader.readInt(u32, .little);
+    if (mmio.CRC_RX.* != frame.CRC_RESIDUE)
+        return error.ChecksumMismatch;
+    return request;
+}
+
+pub fn writeEventChecked(response: proto.Event) !void {
+    mmio.CRC_TX.* = 0;
+    try response.write(writer);
+    try writer.writeInt(u32, mmio.CRC_TX.*, .little);
+}
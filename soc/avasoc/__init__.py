@@ -3,27 +3,56 @@ import os
 
 import niar
 
-from . import rtl
-from .targets import cxxrtl, icebreaker
+from . import batch, lz, rtl, sweep
+from .rtl.core import Core
+from .targets import cxxrtl, cxxrtl_faithful, icebreaker, icebreaker_lz
 
 
 __all__ = ["AvaSoc", "main"]
 
 logger = logging.getLogger("avasoc")
 
+FIRMWARE_IMAGE = "../core/zig-out/bin/avacore.bin"
+
 class AvaSoc(niar.Project):
     name = "avasoc"
     top = rtl.Top
-    targets = [icebreaker]
-    cxxrtl_targets = [cxxrtl]
+    targets = [icebreaker, icebreaker_lz]
+    cxxrtl_targets = [cxxrtl, cxxrtl_faithful]
     externals = ["avasoc/VexRiscv.v"]
 
 
 @AvaSoc.command(help="flash imem ROM")
 def flash(p, parser):
     def exec(args):
-        offset = int(args.offset, base=0)
-        cmd = ["iceprog", "-o", hex(offset), "../core/zig-out/bin/avacore.bin"]
+        if args.compress:
+            if args.image is None or args.offset is None:
+                parser.error("--compress needs an explicit image and --offset")
+            offset = int(args.offset, base=0)
+            image = args.image
+            with open(image, "rb") as f:
+                data = f.read()
+            compressed = lz.compress(data)
+            logger.info(f"compressed {image}: {len(data)} -> {len(compressed)} bytes")
+
+            # Keep clear of the firmware, and within the reader's 24-bit address.
+            end = offset + len(compressed)
+            imem_start = Core.SPI_IMEM_BASE
+            imem_end = imem_start + Core.SPI_IMEM_BYTES
+            if offset < imem_end and end > imem_start:
+                parser.error(f"{offset:#x}..{end:#x} overlaps the firmware at "
+                             f"{imem_start:#x}..{imem_end:#x}")
+            if end > 1 << 24:
+                parser.error(f"{offset:#x}..{end:#x} is past the LZ reader's address range")
+
+            os.makedirs(p.path.build(), exist_ok=True)
+            image = p.path.build(os.path.basename(image) + ".lz")
+            with open(image, "wb") as f:
+                f.write(compressed)
+        else:
+            offset = int(args.offset or "0x800000", base=0)
+            image = args.image or FIRMWARE_IMAGE
+        cmd = ["iceprog", "-o", hex(offset), str(image)]
         logger.debug(f"executing: {" ".join(cmd)}")
         os.execvp("iceprog", cmd)
 
@@ -32,10 +61,30 @@ def flash(p, parser):
         "-o",
         "--offset",
         action="store",
-        default='0x800000',
         type=str,
-        help="start address for write; defaults to 0x0080_0000",
+        help="start address for write; defaults to 0x0080_0000 unless compressing",
+    )
+    parser.add_argument(
+        "-z",
+        "--compress",
+        action="store_true",
+        help="compress the image for reading through the LZ reader, as built "
+             "into icebreaker_lz; needs an explicit image and offset clear of the "
+             "firmware",
     )
+    parser.add_argument(
+        "image",
+        nargs="?",
+        help=f"image to flash; defaults to {FIRMWARE_IMAGE} unless compressing",
+    )
+
+@AvaSoc.command(help="build for iCEBreaker, sweeping nextpnr seeds for the best Fmax")
+def seeds(p, parser):
+    sweep.add_arguments(p, parser)
+
+@AvaSoc.command(help="run BASIC programs on many built CXXRTL simulators at once")
+def simbatch(p, parser):
+    batch.add_arguments(p, parser)
 
 def main():
     AvaSoc().main()
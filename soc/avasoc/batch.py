@@ -0,0 +1,278 @@
+import csv
+import glob
+import logging
+import os
+import re
+import socket
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .proto import ChecksumMismatch, EventTag, RequestTag, read_event, write_request
+
+
+__all__ = ["add_arguments"]
+
+logger = logging.getLogger(__name__)
+
+FINISHED_RE = re.compile(r"^finished at tick number (\d+)$", flags=re.MULTILINE)
+PRAGMA_RE = re.compile(r"^\s*PRAGMA\b.*$", flags=re.MULTILINE | re.IGNORECASE)
+PRINTED_RE = re.compile(r'^\s*PRAGMA\s+PRINTED\s+"([^"]*)"', flags=re.MULTILINE | re.IGNORECASE)
+
+# Events the core sends in drive() before MACHINE_EXEC when starting from
+# reset: VERSION, INVALID (no machine yet) and OK.
+INIT_EVENTS = 3
+
+# Relative to the project root.
+DEFAULT_PROGRAMS = [("..", "basic", "src", "test", "*.bas")]
+
+
+def add_arguments(p, parser):
+    parser.set_defaults(func=lambda args: main(p, args))
+    targets = sorted(t.__name__ for t in p.cxxrtl_targets)
+    parser.add_argument(
+        "-t",
+        "--target",
+        choices=targets,
+        default=targets[0],
+        help=f"which built CXXRTL target to run; defaults to {targets[0]}",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        default=os.cpu_count(),
+        type=int,
+        help="number of simulators to run at once; defaults to the CPU count",
+    )
+    parser.add_argument(
+        "--timeout",
+        action="store",
+        default=600,
+        type=float,
+        help="seconds to wait on a simulator before giving up; defaults to 600",
+    )
+    snapshot = parser.add_mutually_exclusive_group()
+    snapshot.add_argument(
+        "--snapshot-at",
+        action="store",
+        type=int,
+        help="snapshot each simulator at this tick number, and restore later runs from "
+             "that snapshot while the build is unchanged",
+    )
+    snapshot.add_argument(
+        "--snapshot-after-init",
+        action="store_true",
+        help="as --snapshot-at, but snapshot once the machine is initialised, so "
+             "restored runs skip MACHINE_INIT too",
+    )
+    parser.add_argument(
+        "--checked-frames",
+        action="store_true",
+        help="expect a CRC-32 trailer on every frame, for a core built with "
+             "-Dchecked-frames",
+    )
+    parser.add_argument(
+        "programs",
+        nargs="*",
+        help="BASIC source (.bas) or bytecode (.avc) to run; defaults to the "
+             "basic test programs",
+    )
+
+
+def main(p, args):
+    exe = p.path.build(args.target, p.name)
+    if not exe.is_file():
+        raise RuntimeError(f"{exe} not found; build it with `cxxrtl -t {args.target} -c`")
+
+    programs = args.programs or sorted(path for pattern in DEFAULT_PROGRAMS
+                                       for path in glob.glob(str(p.path(*pattern))))
+    if not programs:
+        raise RuntimeError("no programs to run")
+    out_dir = p.path.build(args.target, "simbatch")
+    os.makedirs(out_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as sock_dir:
+        def run_one(i_program):
+            i, program = i_program
+            return run(p, args, exe, os.path.join(sock_dir, f"{i}.sock"), program, out_dir)
+
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(run_one, enumerate(programs)))
+
+    table_path = p.path.build(args.target, "simbatch.csv")
+    with open(table_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["program", "status", "returncode", "ticks",
+                                               "cycles", "output_bytes", "output"])
+        writer.writeheader()
+        writer.writerows(results)
+
+    width = max(len(result["program"]) for result in results)
+    for result in results:
+        cycles = "-" if result["cycles"] is None else f"{result['cycles']:,}"
+        output = result["output"] or "-"
+        logger.info(f"{result['program']:<{width}}  {result['status']:<8} {output:<8} "
+                    f"{cycles:>15}")
+    logger.info(f"wrote {table_path}")
+
+    if any(result["status"] != "ok" or result["output"] == "mismatch" for result in results):
+        raise RuntimeError("not all programs ran successfully")
+
+
+def run(p, args, exe, sock_path, program, out_dir):
+    result = {"program": program, "status": None, "returncode": None,
+              "ticks": None, "cycles": None, "output_bytes": None, "output": None}
+
+    try:
+        code, expected = compile_program(p, program)
+    except subprocess.CalledProcessError:
+        result["status"] = "compile"
+        return result
+
+    stem = Path(program).stem
+    log_path = out_dir / f"{stem}.log"
+    with open(log_path, "wb") as log:
+        cmd = [exe, "--uart", sock_path]
+        if args.snapshot_at is not None:
+            cmd += ["--snapshot", p.path.build(args.target, "simbatch.snapshot"),
+                    "--restore", "--snapshot-at", str(args.snapshot_at)]
+        elif args.snapshot_after_init:
+            cmd += ["--snapshot", p.path.build(args.target, "simbatch.snapshot"),
+                    "--restore", "--snapshot-after", str(INIT_EVENTS)]
+        if args.checked_frames:
+            cmd.append("--checked-frames")
+        proc = subprocess.Popen(cmd, stdout=log, stderr=log)
+        try:
+            status, output = drive(proc, sock_path, code, args.timeout, checked=args.checked_frames)
+            if status == "protocol":
+                proc.kill()
+            result["returncode"] = proc.wait(timeout=args.timeout)
+        except (TimeoutError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+            status, output = "timeout", b""
+        except ChecksumMismatch:
+            proc.kill()
+            result["returncode"] = proc.wait()
+            status, output = "checksum", b""
+        except (EOFError, ConnectionError):
+            result["returncode"] = proc.wait()
+            status, output = "crashed", b""
+
+    with open(out_dir / f"{stem}.out", "wb") as f:
+        f.write(output)
+    if expected is not None:
+        with open(out_dir / f"{stem}.expected", "wb") as f:
+            f.write(expected)
+        result["output"] = "pass" if output == expected else "mismatch"
+
+    with open(log_path, "r", errors="replace") as f:
+        if m := FINISHED_RE.search(f.read()):
+            result["ticks"] = int(m[1])
+            # Two ticks per clock cycle.
+            result["cycles"] = result["ticks"] // 2
+
+    if status == "ok" and result["returncode"] != 0:
+        status = "crashed"
+    result["status"] = status
+    result["output_bytes"] = len(output)
+    return result
+
+
+def compile_program(p, program):
+    # Returns the bytecode, and the output expected of it if known.
+    with open(program, "rb") as f:
+        source = f.read()
+    if not program.lower().endswith(".bas"):
+        return source, None
+
+    # PRAGMA PRINTED is a test harness expectation; the core doesn't support it.
+    # Each gives what was printed since the last, so together they give the
+    # whole output.
+    source = source.decode()
+    printed = PRINTED_RE.findall(source)
+    expected = "".join(parse_pragma_string(s) for s in printed).encode() if printed else None
+
+    source = PRAGMA_RE.sub("", source).encode()
+    avabasic = p.path("..", "basic", "zig-out", "bin", "avabasic")
+    code = subprocess.run([avabasic, "compile", "-"], input=source,
+                          stdout=subprocess.PIPE, check=True).stdout
+    return code, expected
+
+
+def parse_pragma_string(s):
+    # As parsePragmaString in basic/src/test.zig.
+    return s.replace("\\n", "\n")
+
+
+def drive(proc, sock_path, code, timeout, *, checked=False):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(sock_path)
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            # Exited before listening, e.g. on a bad argument or snapshot.
+            if proc.poll() is not None:
+                raise ConnectionError("simulator exited before accepting a connection")
+            if time.monotonic() > deadline:
+                raise TimeoutError
+            time.sleep(0.1)
+
+    with sock:
+        sock.settimeout(timeout)
+        f = sock.makefile("rwb")
+
+        def request(tag, payload=b""):
+            write_request(f, tag, payload, checked=checked)
+
+        def event():
+            return read_event(f, checked=checked)
+
+        request(RequestTag.HELLO)
+        if event()[0] != EventTag.VERSION:
+            return "protocol", b""
+        # A machine restored from a snapshot is ready to go.
+        request(RequestTag.MACHINE_QUERY)
+        match event()[0]:
+            case EventTag.OK:
+                pass
+            case EventTag.INVALID:
+                request(RequestTag.MACHINE_INIT)
+                if event()[0] != EventTag.OK:
+                    return "protocol", b""
+            case _:
+                return "protocol", b""
+
+        request(RequestTag.MACHINE_EXEC, code)
+        output = bytearray()
+        while True:
+            tag, payload = event()
+            match tag:
+                case EventTag.DEBUG:
+                    output += payload
+                case EventTag.OK:
+                    status = "ok"
+                    break
+                case EventTag.INVALID:
+                    status = "invalid"
+                    break
+                case EventTag.ERROR:
+                    output += payload
+                    # The core has stopped; the simulator exits by itself.
+                    return "error", bytes(output)
+
+        # The core acknowledges EXIT with one last DEBUG event and stops, at
+        # which point the simulator exits and the connection closes.
+        request(RequestTag.EXIT)
+        try:
+            while True:
+                event()
+        except EOFError:
+            pass
+
+    return status, bytes(output)
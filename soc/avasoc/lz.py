@@ -0,0 +1,96 @@
+import struct
+
+
+__all__ = ["compress", "decompress"]
+
+# Reference implementation of the format decoded by rtl/lz.py.
+#
+# An image is the decompressed length (u32 LE) followed by tokens:
+#
+#   0LLLLLLL                     L+1 literal bytes follow.
+#   1LLLLLOO OOOOOOOO            copy L+3 bytes from O+1 bytes back.
+#
+# Copies may overlap the bytes they produce, so a run is a literal followed by
+# a copy from 1 byte back.
+
+WINDOW = 1024
+MIN_MATCH = 3
+MAX_MATCH = 34
+MAX_LITERALS = 128
+
+# Candidates considered per position; trades ratio for compression time.
+MAX_CHAIN = 64
+
+
+def compress(data):
+    out = bytearray(struct.pack("<L", len(data)))
+    literals = bytearray()
+    chains = {}
+
+    def flush_literals():
+        while literals:
+            run = literals[:MAX_LITERALS]
+            out.append(len(run) - 1)
+            out.extend(run)
+            del literals[:MAX_LITERALS]
+
+    def insert(i):
+        if i + MIN_MATCH <= len(data):
+            chain = chains.setdefault(data[i:i + MIN_MATCH], [])
+            chain.append(i)
+            if len(chain) > MAX_CHAIN:
+                del chain[0]
+
+    i = 0
+    while i < len(data):
+        best_length, best_offset = 0, 0
+        limit = min(MAX_MATCH, len(data) - i)
+        for j in reversed(chains.get(data[i:i + MIN_MATCH], ())):
+            if i - j > WINDOW:
+                break
+            length = 0
+            while length < limit and data[j + length] == data[i + length]:
+                length += 1
+            if length > best_length:
+                best_length, best_offset = length, i - j
+                if length == limit:
+                    break
+
+        if best_length >= MIN_MATCH:
+            flush_literals()
+            out.append(0x80 | ((best_length - MIN_MATCH) << 2) | ((best_offset - 1) >> 8))
+            out.append((best_offset - 1) & 0xFF)
+            for k in range(i, i + best_length):
+                insert(k)
+            i += best_length
+        else:
+            literals.append(data[i])
+            insert(i)
+            i += 1
+
+    flush_literals()
+    return bytes(out)
+
+
+def decompress(image):
+    (length,) = struct.unpack("<L", image[:4])
+    out = bytearray()
+    i = 4
+    while len(out) < length:
+        token = image[i]
+        i += 1
+        if token & 0x80:
+            count = ((token >> 2) & 0x1F) + MIN_MATCH
+            offset = (((token & 0x3) << 8) | image[i]) + 1
+            i += 1
+            if offset > len(out):
+                raise ValueError(f"copy from {offset} bytes back at {len(out)}")
+            for _ in range(count):
+                out.append(out[-offset])
+        else:
+            count = token + 1
+            out.extend(image[i:i + count])
+            i += count
+    if len(out) != length:
+        raise ValueError(f"expected {length} bytes, got {len(out)}")
+    return bytes(out)
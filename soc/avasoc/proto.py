@@ -0,0 +1,71 @@
+import struct
+import zlib
+from enum import IntEnum
+
+
+__all__ = ["RequestTag", "EventTag", "ChecksumMismatch", "write_request", "read_event"]
+
+# Mirrors core/src/proto.zig; framing per core/src/frame.zig.
+
+
+class RequestTag(IntEnum):
+    HELLO = 0x01
+    MACHINE_INIT = 0x02
+    MACHINE_QUERY = 0x03
+    MACHINE_EXEC = 0x04
+    DUMP_HEAP = 0xfd
+    EXIT = 0xfe
+
+
+class EventTag(IntEnum):
+    OK = 0x01
+    VERSION = 0x02
+    DEBUG = 0x03
+    INVALID = 0x04
+    ERROR = 0xfe
+
+
+class ChecksumMismatch(Exception):
+    pass
+
+
+# CRC-32 of any checked frame followed by its CRC.
+CRC_RESIDUE = 0x2144DF1C
+
+
+# Tags carrying a []const u8 payload; all others are void.
+REQUEST_SLICES = {RequestTag.MACHINE_EXEC}
+EVENT_SLICES = {EventTag.VERSION, EventTag.DEBUG, EventTag.ERROR}
+
+
+def write_request(f, tag, payload=b"", *, checked=False):
+    body = struct.pack("<B", tag)
+    if tag in REQUEST_SLICES:
+        body += struct.pack("<L", len(payload)) + payload
+    frame = struct.pack("<H", len(body)) + body
+    if checked:
+        frame += struct.pack("<L", zlib.crc32(frame))
+    f.write(frame)
+    f.flush()
+
+
+def read_event(f, *, checked=False):
+    header = _read_exactly(f, 2)
+    (length,) = struct.unpack("<H", header)
+    frame = _read_exactly(f, length)
+    if checked:
+        trailer = _read_exactly(f, 4)
+        if zlib.crc32(header + frame + trailer) != CRC_RESIDUE:
+            raise ChecksumMismatch
+    tag = EventTag(frame[0])
+    if tag in EVENT_SLICES:
+        (slice_length,) = struct.unpack("<L", frame[1:5])
+        return tag, frame[5:5 + slice_length]
+    return tag, None
+
+
+def _read_exactly(f, n):
+    b = f.read(n)
+    if len(b) != n:
+        raise EOFError
+    return b
@@ -28,6 +28,10 @@ class Top(wiring.Component):
 
                 "spifr_res_p": In(8),
                 "spifr_res_valid": In(1),
+
+                "spifr_powerdown_cycles": Out(8),
+                "spifr_command_cycles": Out(8),
+                "spifr_byte_cycles": Out(8),
             })
         else:
             super().__init__({})
@@ -38,7 +42,7 @@ class Top(wiring.Component):
         rst = Signal()
         m.d.sync += rst.eq(0)
 
-        core = Core()
+        core = Core(lz_reader=platform.lz_reader)
 
         match platform:
             case icebreaker():
@@ -70,6 +74,13 @@ class Top(wiring.Component):
                     core.spifr_bus.res.valid.eq      (self.spifr_res_valid),
                 ]
 
+                timing = platform.spi_flash_timing
+                m.d.comb += [
+                    self.spifr_powerdown_cycles.eq(timing.powerdown),
+                    self.spifr_command_cycles.eq(timing.command + timing.address + timing.dummy),
+                    self.spifr_byte_cycles.eq(timing.byte),
+                ]
+
         m.submodules.core = ResetInserter(rst)(EnableInserter(core.running)(core))
 
         return m
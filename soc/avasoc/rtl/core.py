@@ -6,8 +6,10 @@ from amaranth_soc.csr.wishbone import WishboneCSRBridge
 from amaranth_soc.memory import MemoryMap
 from amaranth_soc.wishbone.sram import WishboneSRAM
 
+from .crc import WishboneCRC32
 from .imem import WishboneIMem
-from .spifr import SPIFlashReader
+from .lz import WishboneLZReader
+from .spifr import SPIFlashArbiter, SPIFlashReader
 from .uart import WishboneUART
 
 
@@ -16,6 +18,8 @@ __all__ = ["Core"]
 class Core(wiring.Component):
     # IMEM is backed by SPI flash; we use VexRiscv's built-in I$.
     SPI_IMEM_BASE = 0x0080_0000
+    # As much as core.ld gives imem.
+    SPI_IMEM_BYTES = 1024 * 1024
 
     # We're targetting the iCE40UP SPRAM for DMEM, which gives us 128KiB.
     # SPRAM is in 4x 32KiB blocks (16 bits wide, 16,384 deep).
@@ -37,11 +41,17 @@ class Core(wiring.Component):
     IMEM_BASE = 0x8000_0000
     UART_BASE = 0xf000_0000
     CSR_BASE  = 0xf001_0000
+    CRC_BASE  = 0xf002_0000
+    LZ_BASE   = 0xf003_0000
 
     running: Out(1)
 
     spifr_bus: Out(SPIFlashReader.Signature)
 
+    def __init__(self, *, lz_reader=False):
+        self._lz_reader = lz_reader
+        super().__init__()
+
     def elaborate(self, platform):
         m = Module()
 
@@ -52,7 +62,13 @@ class Core(wiring.Component):
         m.d.comb += self.running.eq(running)
 
         m.submodules.imem = imem = WishboneIMem(base=self.SPI_IMEM_BASE)
-        wiring.connect(m, wiring.flipped(self.spifr_bus), imem.spifr_bus)
+        if self._lz_reader:
+            # IMEM and the LZ reader share the SPI flash.
+            m.submodules.spifr_arbiter = spifr_arbiter = SPIFlashArbiter(2)
+            wiring.connect(m, wiring.flipped(self.spifr_bus), spifr_arbiter.bus)
+            wiring.connect(m, imem.spifr_bus, spifr_arbiter.ports[0])
+        else:
+            wiring.connect(m, wiring.flipped(self.spifr_bus), imem.spifr_bus)
 
         m.submodules.imem_arbiter = imem_arbiter = wishbone.Arbiter(addr_width=22, data_width=32, granularity=8, features={"err", "cti", "bte"})
         wiring.connect(m, imem_arbiter.bus, imem.wb_bus)
@@ -82,6 +98,15 @@ class Core(wiring.Component):
                                                 tx_fifo_depth=32, rx_fifo_depth=32)
         dbus.add(uart.wb_bus, name="uart", addr=self.UART_BASE)
 
+        m.submodules.crc = crc = WishboneCRC32()
+        dbus.add(crc.wb_bus, name="crc", addr=self.CRC_BASE)
+        crc.snoop(m, uart.uart)
+
+        if self._lz_reader:
+            m.submodules.lz = lz = WishboneLZReader()
+            wiring.connect(m, lz.spifr_bus, spifr_arbiter.ports[1])
+            dbus.add(lz.wb_bus, name="lz", addr=self.LZ_BASE)
+
         m.submodules.csrs = csrs = CSRPeripheral()
         m.submodules.csr_bridge = csr_bridge = WishboneCSRBridge(csrs.bus, data_width=32)
         dbus.add(csr_bridge.wb_bus, name="csr_bridge", addr=self.CSR_BASE)
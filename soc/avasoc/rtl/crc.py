@@ -0,0 +1,127 @@
+from amaranth import *
+from amaranth.lib import crc, stream, wiring
+from amaranth.lib.wiring import In, Out
+from amaranth_soc import wishbone
+from amaranth_soc.memory import MemoryMap
+
+
+__all__ = ["CRC32", "WishboneCRC32"]
+
+
+class CRC32(wiring.Component):
+    # CRC-32/ISO-HDLC, as computed by zlib.crc32 and std.hash.Crc32.
+    Parameters = crc.catalog.CRC32_ISO_HDLC(data_width=8)
+
+    start: In(1)
+    data: In(stream.Signature(8, always_ready=True))
+    crc: Out(32)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.processor = processor = self.Parameters.create()
+        m.d.comb += [
+            processor.start.eq(self.start),
+            processor.data.eq(self.data.p),
+            processor.valid.eq(self.data.valid),
+            self.crc.eq(processor.crc),
+        ]
+
+        return m
+
+
+class WishboneCRC32(wiring.Component):
+    # Registers, each 32 bits:
+    #
+    #   0x0  CRC   R: CRC of bytes written to DATA.  W: reset it.
+    #   0x4  DATA  W: add the bytes selected by SEL to CRC, lowest lane first.
+    #   0x8  RX    R: CRC of bytes read from the UART.  W: reset it.
+    #   0xC  TX    R: CRC of bytes written to the UART.  W: reset it.
+    #
+    # RX and TX snoop the UART's streams, so framing costs the CPU nothing
+    # beyond resetting and reading them.
+    wb_bus: In(wishbone.bus.Signature(addr_width=2, data_width=32,
+                                      granularity=8, features={"err"}))
+
+    rx: In(stream.Signature(8, always_ready=True))
+    tx: In(stream.Signature(8, always_ready=True))
+
+    def __init__(self):
+        self._crc = CRC32()
+        self._rx = CRC32()
+        self._tx = CRC32()
+
+        super().__init__()
+        self.wb_bus.memory_map = MemoryMap(addr_width=4, data_width=8)
+        self.wb_bus.memory_map.add_resource(self._crc, name=("crc",), size=8)
+        self.wb_bus.memory_map.add_resource(self._rx, name=("rx",), size=4)
+        self.wb_bus.memory_map.add_resource(self._tx, name=("tx",), size=4)
+        self.wb_bus.memory_map.freeze()
+
+    def snoop(self, m, uart):
+        # Follow the UART's FIFO handshakes, so RX and TX cover exactly the
+        # bytes the CPU read and wrote.
+        m.d.comb += [
+            self.rx.p.eq(uart.rd.p),
+            self.rx.valid.eq(uart.rd.valid & uart.rd.ready),
+            self.tx.p.eq(uart.wr.p),
+            self.tx.valid.eq(uart.wr.valid & uart.wr.ready),
+        ]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.crc = self._crc
+        m.submodules.rx = self._rx
+        m.submodules.tx = self._tx
+
+        m.d.comb += [
+            self._rx.data.p.eq(self.rx.p),
+            self._rx.data.valid.eq(self.rx.valid),
+            self._tx.data.p.eq(self.tx.p),
+            self._tx.data.valid.eq(self.tx.valid),
+        ]
+
+        with m.Switch(self.wb_bus.adr):
+            with m.Case(0):
+                m.d.comb += self.wb_bus.dat_r.eq(self._crc.crc)
+            with m.Case(2):
+                m.d.comb += self.wb_bus.dat_r.eq(self._rx.crc)
+            with m.Case(3):
+                m.d.comb += self.wb_bus.dat_r.eq(self._tx.crc)
+
+        # A DATA write is fed in a byte per cycle, and acked after the last.
+        data = Signal(32)
+        lanes = Signal(4)
+        m.d.comb += [
+            self._crc.data.p.eq(data[:8]),
+            self._crc.data.valid.eq(lanes[0]),
+        ]
+
+        with m.If(lanes != 0):
+            m.d.sync += [
+                data.eq(data >> 8),
+                lanes.eq(lanes >> 1),
+            ]
+            with m.If(lanes[1:] == 0):
+                m.d.sync += self.wb_bus.ack.eq(1)
+        with m.Elif(self.wb_bus.ack):
+            m.d.sync += self.wb_bus.ack.eq(0)
+        with m.Elif(self.wb_bus.cyc & self.wb_bus.stb):
+            with m.If(self.wb_bus.we):
+                with m.Switch(self.wb_bus.adr):
+                    with m.Case(0):
+                        m.d.comb += self._crc.start.eq(1)
+                    with m.Case(1):
+                        m.d.sync += [
+                            data.eq(self.wb_bus.dat_w),
+                            lanes.eq(self.wb_bus.sel),
+                        ]
+                    with m.Case(2):
+                        m.d.comb += self._rx.start.eq(1)
+                    with m.Case(3):
+                        m.d.comb += self._tx.start.eq(1)
+            with m.If(~self.wb_bus.we | (self.wb_bus.adr != 1) | (self.wb_bus.sel == 0)):
+                m.d.sync += self.wb_bus.ack.eq(1)
+
+        return m
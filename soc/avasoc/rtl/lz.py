@@ -0,0 +1,294 @@
+from amaranth import *
+from amaranth.lib import stream, wiring
+from amaranth.lib.fifo import SyncFIFOBuffered
+from amaranth.lib.memory import Memory
+from amaranth.lib.wiring import In, Out
+from amaranth_soc import wishbone
+from amaranth_soc.memory import MemoryMap
+
+from .spifr import SPIFlashReader
+
+
+__all__ = ["LZDecompressor", "WishboneLZReader"]
+
+
+class LZDecompressor(wiring.Component):
+    # Decodes the format described in avasoc/lz.py. Literals pass straight
+    # through; copies take two cycles per byte to read back from the window.
+    #
+    # Reset to decode another image.
+    WINDOW = 1024
+    MIN_MATCH = 3
+
+    compressed: In(stream.Signature(8))
+    decompressed: Out(stream.Signature(8))
+
+    length: Out(32)
+    length_valid: Out(1)
+    done: Out(1)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.window = window = Memory(shape=8, depth=self.WINDOW, init=[])
+        wr = window.write_port()
+        rd = window.read_port()
+
+        wptr = Signal(range(self.WINDOW))
+        remaining = Signal(32)
+        count = Signal(8)
+        offset = Signal(range(self.WINDOW))
+        header_byte = Signal(range(4))
+
+        m.d.comb += [
+            wr.addr.eq(wptr),
+            wr.data.eq(self.decompressed.p),
+            rd.en.eq(0),
+        ]
+
+        # Every byte produced goes into the window too.
+        with m.If(self.decompressed.valid & self.decompressed.ready):
+            m.d.comb += wr.en.eq(1)
+            m.d.sync += [
+                wptr.eq(wptr + 1),
+                remaining.eq(remaining - 1),
+                count.eq(count - 1),
+            ]
+
+        with m.FSM() as fsm:
+            m.d.comb += [
+                self.length_valid.eq(~fsm.ongoing('header')),
+                self.done.eq(fsm.ongoing('done')),
+            ]
+
+            with m.State('header'):
+                next_length = Cat(self.length[8:], self.compressed.p)
+                m.d.comb += self.compressed.ready.eq(1)
+                with m.If(self.compressed.valid):
+                    m.d.sync += [
+                        self.length.eq(next_length),
+                        header_byte.eq(header_byte + 1),
+                    ]
+                    with m.If(header_byte == 3):
+                        m.d.sync += remaining.eq(next_length)
+                        m.next = 'token'
+
+            with m.State('token'):
+                with m.If(remaining == 0):
+                    m.next = 'done'
+                with m.Else():
+                    m.d.comb += self.compressed.ready.eq(1)
+                    with m.If(self.compressed.valid):
+                        with m.If(self.compressed.p[7]):
+                            m.d.sync += [
+                                count.eq(self.compressed.p[2:7] + self.MIN_MATCH),
+                                offset[8:].eq(self.compressed.p[:2]),
+                            ]
+                            m.next = 'match'
+                        with m.Else():
+                            m.d.sync += count.eq(self.compressed.p[:7] + 1)
+                            m.next = 'literal'
+
+            with m.State('literal'):
+                m.d.comb += [
+                    self.decompressed.p.eq(self.compressed.p),
+                    self.decompressed.valid.eq(self.compressed.valid),
+                    self.compressed.ready.eq(self.decompressed.ready),
+                ]
+                with m.If(self.decompressed.valid & self.decompressed.ready):
+                    with m.If((count == 1) | (remaining == 1)):
+                        m.next = 'token'
+
+            with m.State('match'):
+                m.d.comb += self.compressed.ready.eq(1)
+                with m.If(self.compressed.valid):
+                    m.d.sync += offset[:8].eq(self.compressed.p)
+                    m.next = 'copy.read'
+
+            with m.State('copy.read'):
+                m.d.comb += [
+                    rd.addr.eq(wptr - offset - 1),
+                    rd.en.eq(1),
+                ]
+                m.next = 'copy.write'
+
+            with m.State('copy.write'):
+                m.d.comb += [
+                    self.decompressed.p.eq(rd.data),
+                    self.decompressed.valid.eq(1),
+                ]
+                with m.If(self.decompressed.ready):
+                    with m.If((count == 1) | (remaining == 1)):
+                        m.next = 'token'
+                    with m.Else():
+                        m.next = 'copy.read'
+
+            with m.State('done'):
+                pass
+
+        return m
+
+
+class WishboneLZReader(wiring.Component):
+    # Registers, each 32 bits:
+    #
+    #   0x0  ADDR  W: start decompressing the image at this flash address.
+    #   0x4  LEN   R: decompressed length of the image; blocks until known.
+    #   0x8  DATA  R: the next decompressed bytes into the lanes selected by
+    #                 SEL, lowest lane first; blocks until available.  Reads
+    #                 as 0 past the end of the image.
+    #
+    # Compressed bytes are fetched from flash ahead of the decompressor into a
+    # FIFO. The read is stopped before the FIFO can overflow, and resumed once
+    # it has drained, letting IMEM fetches in between.
+    wb_bus: In(wishbone.bus.Signature(addr_width=2, data_width=32,
+                                      granularity=8, features={"err"}))
+    spifr_bus: Out(SPIFlashReader.Signature)
+
+    FIFO_DEPTH = 16
+    # A stop may be handshaken just as a byte completes, in which case two
+    # more follow it.
+    FIFO_SLACK = 3
+
+    def __init__(self):
+        self._lz = LZDecompressor()
+
+        super().__init__()
+        self.wb_bus.memory_map = MemoryMap(addr_width=4, data_width=8)
+        # ADDR, LEN and DATA all drive or read the decompressor.
+        self.wb_bus.memory_map.add_resource(self._lz, name=("lz",), size=12)
+        self.wb_bus.memory_map.freeze()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        flush = Signal()
+        m.submodules.fifo = fifo = ResetInserter(flush)(
+            SyncFIFOBuffered(width=8, depth=self.FIFO_DEPTH))
+        m.submodules.lz = ResetInserter(flush)(self._lz)
+        lz = self._lz
+
+        m.d.comb += [
+            lz.compressed.p.eq(fifo.r_data),
+            lz.compressed.valid.eq(fifo.r_rdy),
+            fifo.r_en.eq(lz.compressed.ready),
+        ]
+
+        # Nothing has been started until the first ADDR write.
+        started = Signal()
+        end = Signal()
+        m.d.comb += end.eq(~started | lz.done)
+
+        addr = Signal(24)
+        restart = Signal()
+
+        m.d.comb += [
+            fifo.w_data.eq(self.spifr_bus.res.p),
+            fifo.w_en.eq(self.spifr_bus.res.valid),
+        ]
+        with m.If(self.spifr_bus.res.valid):
+            m.d.sync += addr.eq(addr + 1)
+
+        with m.FSM():
+            with m.State('idle'):
+                with m.If(restart):
+                    m.next = 'restart'
+                with m.Elif(~end & (fifo.w_level <= self.FIFO_DEPTH // 2)):
+                    m.next = 'addr'
+
+            with m.State('addr'):
+                m.d.comb += [
+                    self.spifr_bus.addr_stb.p.eq(addr),
+                    self.spifr_bus.addr_stb.valid.eq(1),
+                ]
+                with m.If(self.spifr_bus.addr_stb.ready):
+                    m.next = 'read'
+
+            with m.State('restart'):
+                # The reader only accepts the new address once any read still
+                # in progress has delivered its last byte; that byte is flushed
+                # along with everything else of the old image.
+                m.d.comb += [
+                    self.spifr_bus.addr_stb.p.eq(self.wb_bus.dat_w[:24]),
+                    self.spifr_bus.addr_stb.valid.eq(1),
+                ]
+                with m.If(self.spifr_bus.addr_stb.ready):
+                    m.d.comb += flush.eq(1)
+                    m.d.sync += [
+                        addr.eq(self.wb_bus.dat_w[:24]),
+                        started.eq(1),
+                    ]
+                    m.next = 'read'
+
+            with m.State('read'):
+                with m.If(restart | end |
+                          (fifo.w_level >= self.FIFO_DEPTH - self.FIFO_SLACK)):
+                    m.next = 'stop'
+
+            with m.State('stop'):
+                m.d.comb += self.spifr_bus.stop_stb.valid.eq(1)
+                with m.If(self.spifr_bus.stop_stb.ready):
+                    m.next = 'idle'
+
+        lanes = Signal(4)
+        lane = Signal(range(4))
+
+        with m.FSM():
+            with m.State('idle'):
+                with m.If(self.wb_bus.ack):
+                    m.d.sync += self.wb_bus.ack.eq(0)
+                with m.Elif(self.wb_bus.cyc & self.wb_bus.stb):
+                    m.d.sync += self.wb_bus.dat_r.eq(0)
+                    with m.If(self.wb_bus.we):
+                        with m.If(self.wb_bus.adr == 0):
+                            m.next = 'restart'
+                        with m.Else():
+                            m.d.sync += self.wb_bus.ack.eq(1)
+                    with m.Else():
+                        with m.Switch(self.wb_bus.adr):
+                            with m.Case(1):
+                                m.next = 'length'
+                            with m.Case(2):
+                                m.d.sync += [
+                                    lanes.eq(self.wb_bus.sel),
+                                    lane.eq(0),
+                                ]
+                                m.next = 'data'
+                            with m.Default():
+                                m.d.sync += self.wb_bus.ack.eq(1)
+
+            with m.State('restart'):
+                m.d.comb += restart.eq(1)
+                with m.If(flush):
+                    m.d.sync += self.wb_bus.ack.eq(1)
+                    m.next = 'idle'
+
+            with m.State('length'):
+                with m.If(~started):
+                    m.d.sync += self.wb_bus.ack.eq(1)
+                    m.next = 'idle'
+                with m.Elif(lz.length_valid):
+                    m.d.sync += [
+                        self.wb_bus.dat_r.eq(lz.length),
+                        self.wb_bus.ack.eq(1),
+                    ]
+                    m.next = 'idle'
+
+            with m.State('data'):
+                with m.If(lanes == 0):
+                    m.d.sync += self.wb_bus.ack.eq(1)
+                    m.next = 'idle'
+                with m.Elif(~lanes[0] | end):
+                    m.d.sync += [
+                        lanes.eq(lanes >> 1),
+                        lane.eq(lane + 1),
+                    ]
+                with m.Elif(lz.decompressed.valid):
+                    m.d.comb += lz.decompressed.ready.eq(1)
+                    m.d.sync += [
+                        self.wb_bus.dat_r.word_select(lane, 8).eq(lz.decompressed.p),
+                        lanes.eq(lanes >> 1),
+                        lane.eq(lane + 1),
+                    ]
+
+        return m
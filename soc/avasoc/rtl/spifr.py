@@ -7,7 +7,7 @@ from amaranth.lib.wiring import In, Out
 from ..targets import icebreaker
 
 
-__all__ = ["SPIFlashReader"]
+__all__ = ["SPIFlashReader", "SPIFlashArbiter"]
 
 
 class SPIFlashReader(wiring.Component):
@@ -132,3 +132,53 @@ class SPIFlashReader(wiring.Component):
                         m.next = 'cmd.wait'
 
         return m
+
+
+class SPIFlashArbiter(wiring.Component):
+    # Shares one SPIFlashReader between several users, round-robin.
+    #
+    # The reader only accepts an address once the previous read (including the
+    # byte in flight when it was stopped) has completed, so the winner of the
+    # address handshake owns stop and res until the next one.
+    def __init__(self, n):
+        self._n = n
+        super().__init__({
+            "ports": In(SPIFlashReader.Signature).array(n),
+            "bus": Out(SPIFlashReader.Signature),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        owner = Signal(range(self._n))
+        grant = Signal(range(self._n))
+        granted = Signal()
+
+        # Later assignments win: the lowest-numbered port other than the last
+        # owner first, and the last owner only if nobody else is waiting.
+        for i, port in reversed(list(enumerate(self.ports))):
+            with m.If(port.addr_stb.valid & (owner == i)):
+                m.d.comb += [grant.eq(i), granted.eq(1)]
+        for i, port in reversed(list(enumerate(self.ports))):
+            with m.If(port.addr_stb.valid & (owner != i)):
+                m.d.comb += [grant.eq(i), granted.eq(1)]
+
+        for i, port in enumerate(self.ports):
+            with m.If(granted & (grant == i)):
+                m.d.comb += [
+                    self.bus.addr_stb.p.eq(port.addr_stb.p),
+                    self.bus.addr_stb.valid.eq(1),
+                    port.addr_stb.ready.eq(self.bus.addr_stb.ready),
+                ]
+                with m.If(self.bus.addr_stb.ready):
+                    m.d.sync += owner.eq(i)
+
+            m.d.comb += port.res.p.eq(self.bus.res.p)
+            with m.If(owner == i):
+                m.d.comb += [
+                    self.bus.stop_stb.valid.eq(port.stop_stb.valid),
+                    port.stop_stb.ready.eq(self.bus.stop_stb.ready),
+                    port.res.valid.eq(self.bus.res.valid),
+                ]
+
+        return m
@@ -104,6 +104,10 @@ class WishboneUART(wiring.Component):
         self.wb_bus.memory_map.add_resource(self._uart, name=("uart",), size=2)
         self.wb_bus.memory_map.freeze()
 
+    @property
+    def uart(self):
+        return self._uart
+
     def elaborate(self, platform):
         m = Module()
 
@@ -121,9 +125,11 @@ class WishboneUART(wiring.Component):
                     m.d.comb += self._uart.wr.valid.eq(1)
                     m.d.sync += self.wb_bus.ack.eq(self._uart.wr.ready)
                 with m.Else():
-                    # Data-only read blocks the CPU.
-                    m.d.sync += self._uart.rd.ready.eq(1)
-                    m.d.sync += self.wb_bus.ack.eq(self._uart.rd.valid)
+                    # Data-only read blocks the CPU. The byte is only taken in
+                    # the cycle it's acked, so it's the one the CPU sees.
+                    with m.If(self._uart.rd.valid):
+                        m.d.sync += self.wb_bus.ack.eq(1)
+                        m.d.sync += self._uart.rd.ready.eq(1)
             with m.Elif((self.wb_bus.sel == 0b0011) & ~self.wb_bus.we):
                 m.d.sync += self.wb_bus.ack.eq(1)
                 m.d.sync += self._uart.rd.ready.eq(1)
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from amaranth._toolchain import tool_env_var
+from amaranth.build.run import LocalBuildProducts
+
+from . import rtl
+from .targets import icebreaker
+
+
+__all__ = ["add_arguments", "parse_fmax"]
+
+logger = logging.getLogger(__name__)
+
+FMAX_RE = re.compile(r"^Info: Max frequency for clock +'(?P<clock>[^']+)': (?P<mhz>[\d.]+) MHz",
+                     flags=re.MULTILINE)
+
+
+def add_arguments(p, parser):
+    parser.set_defaults(func=lambda args: main(p, args))
+    parser.add_argument(
+        "-n",
+        "--seeds",
+        action="store",
+        default=8,
+        type=int,
+        help="number of nextpnr seeds to try; defaults to 8",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        default=os.cpu_count(),
+        type=int,
+        help="number of nextpnr runs in parallel; defaults to the CPU count",
+    )
+    parser.add_argument(
+        "-s",
+        "--start",
+        action="store",
+        default=1,
+        type=int,
+        help="first seed to try; defaults to 1",
+    )
+    parser.add_argument(
+        "-p",
+        "--program",
+        action="store_true",
+        help="program the best bitstream onto the board after the sweep",
+    )
+
+
+def main(p, args):
+    platform = icebreaker()
+    for path in p.externals:
+        with open(p.path(path), "r") as f:
+            platform.add_file(path, f.read())
+
+    subdir = type(platform).__name__
+    build_dir = p.path.build(subdir)
+
+    # Use the plan's own commands, so overrides like nextpnr_opts apply as
+    # they would to a normal build.
+    plan = platform.prepare(rtl.Top(platform), p.name, **icebreaker.prepare_kwargs)
+    plan.extract(build_dir)
+    commands = {argv[0]: argv for argv in
+                json.loads(plan.files[f"{plan.script}.json"])["commands"]}
+
+    # Synthesise once; every seed places and routes the same netlist.
+    cmd = commands["yosys"]
+    logger.info(f"synthesising: {' '.join(cmd)}")
+    subprocess.run(tool_cmd(platform, cmd), cwd=build_dir, check=True)
+
+    seeds = range(args.start, args.start + args.seeds)
+    logger.info(f"place and route with seeds {seeds.start}..{seeds.stop - 1}, "
+                f"{args.jobs} at a time")
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(
+            lambda seed: pnr(p, platform, commands, build_dir, seed), seeds))
+
+    for result in results:
+        if result["fmax"] is None:
+            logger.warning(f"seed {result['seed']}: failed")
+        else:
+            logger.info(f"seed {result['seed']}: {result['fmax']:.2f} MHz")
+
+    routed = [result for result in results if result["fmax"] is not None]
+    if not routed:
+        raise RuntimeError("no seed placed and routed successfully")
+    best = max(routed, key=lambda result: result["fmax"])
+    logger.info(f"best: seed {best['seed']} at {best['fmax']:.2f} MHz")
+
+    seed_dir = build_dir / "seeds" / str(best["seed"])
+    for ext in ["asc", "bin", "tim"]:
+        shutil.copy(seed_dir / f"{p.name}.{ext}", build_dir / f"{p.name}.{ext}")
+
+    # One line per sweep, so results can be tracked over time.
+    with open(build_dir / "seeds.jsonl", "a") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "synth_opts": icebreaker.prepare_kwargs.get("synth_opts"),
+            "best": best,
+            "results": results,
+        }, f)
+        f.write("\n")
+
+    if args.program:
+        platform.toolchain_program(LocalBuildProducts(build_dir), p.name)
+
+
+def pnr(p, platform, commands, build_dir, seed):
+    seed_dir = build_dir / "seeds" / str(seed)
+    os.makedirs(seed_dir, exist_ok=True)
+
+    # Each seed writes its own log, ASCII bitstream and binary bitstream.
+    outputs = {f"{p.name}.{ext}": str(seed_dir / f"{p.name}.{ext}")
+               for ext in ["tim", "asc", "bin"]}
+
+    def for_seed(argv):
+        return [outputs.get(arg, arg) for arg in argv]
+
+    nextpnr = for_seed(commands["nextpnr-ice40"])
+    nextpnr[1:1] = ["--seed", str(seed)]
+
+    result = {"seed": seed, "fmax": None, "clocks": {}}
+    if subprocess.run(tool_cmd(platform, nextpnr), cwd=build_dir,
+                      stdout=subprocess.DEVNULL).returncode != 0:
+        return result
+
+    if subprocess.run(tool_cmd(platform, for_seed(commands["icepack"])),
+                      cwd=build_dir).returncode != 0:
+        return result
+
+    with open(seed_dir / f"{p.name}.tim", "r") as f:
+        result["clocks"] = parse_fmax(f.read())
+    if result["clocks"]:
+        result["fmax"] = min(result["clocks"].values())
+    return result
+
+
+def tool_cmd(platform, argv):
+    # As the generated build script does: source the toolchain environment if
+    # given, then let e.g. $NEXTPNR_ICE40 name the tool.
+    name, *args = argv
+    env = platform._toolchain_env_var
+    return [
+        "sh", "-c",
+        f'[ -n "${env}" ] && . "${env}"; exec "${{{tool_env_var(name)}:-{name}}}" "$@"',
+        "sh", *args,
+    ]
+
+
+def parse_fmax(log):
+    # nextpnr reports Fmax after placement and again after routing; later
+    # reports overwrite earlier ones, so we end up with the post-route figures.
+    clocks = {}
+    for match in FMAX_RE.finditer(log):
+        clocks[match["clock"]] = float(match["mhz"])
+    return clocks
@@ -5,20 +5,31 @@ from amaranth import *
 from amaranth_boards.icebreaker import ICEBreakerPlatform
 
 
-__all__ = ["icebreaker", "test", "cxxrtl"]
+__all__ = ["icebreaker", "icebreaker_lz", "test", "cxxrtl", "cxxrtl_faithful"]
 
 
 class icebreaker(ICEBreakerPlatform):
     prepare_kwargs = {"synth_opts": "-dsp -spram"}
+    # Include the LZ reader at Core.LZ_BASE; see `flash -z`.
+    lz_reader = False
+
+
+class icebreaker_lz(icebreaker):
+    lz_reader = True
 
 
 class test:
     default_clk_frequency = 1_000_000
+    # Blackboxes the UART's serial side.
+    simulation = True
 
 
 class cxxrtl(niar.CxxrtlPlatform):
     default_clk_frequency = 12_000_000.0
     uses_zig = True
+    # SpiFlashConnector only serves the firmware image, so there'd be nothing
+    # for the reader to read.
+    lz_reader = False
 
     @dataclass
     class Uart:
@@ -29,3 +40,28 @@ class cxxrtl(niar.CxxrtlPlatform):
 
         rx: Pin
         tx: Pin
+
+    # Timing of the harness's SpiFlashConnector, in cycles. These are exported
+    # to the harness through the design's 8-bit ports.
+    @dataclass
+    class SpiFlashTiming:
+        powerdown: int
+        command: int
+        address: int
+        dummy: int
+        byte: int
+
+        def __post_init__(self):
+            assert all(v >= 0 for v in (self.powerdown, self.command, self.address, self.dummy))
+            assert 1 <= self.byte < 256, "the connector counts down at least a cycle per byte"
+            assert self.powerdown < 256
+            assert self.command + self.address + self.dummy < 256
+
+    # Functional model: a byte every couple of cycles, with no command latency.
+    spi_flash_timing = SpiFlashTiming(powerdown=8, command=0, address=0, dummy=0, byte=2)
+
+
+class cxxrtl_faithful(cxxrtl):
+    # Cycle-faithful model of SPIFlashReader on hardware: powerdown release,
+    # then READ (03h) with a 24-bit address, no dummy cycles, 8 cycles per byte.
+    spi_flash_timing = cxxrtl.SpiFlashTiming(powerdown=33, command=8, address=24, dummy=0, byte=8)
@@ -30,12 +30,47 @@ pub fn build(b: *std.Build) void {
     }).module("avacore");
     exe.root_module.addImport("avacore", avacore_mod);
 
+    // Snapshots are keyed on the design they were taken from.
+    var design_digest = std.crypto.hash.sha2.Sha256.init(.{});
     for (cxxrtl_o_paths) |cxxrtl_o_path| {
         exe.addObjectFile(b.path(cxxrtl_o_path));
+        const contents = b.build_root.handle.readFileAlloc(b.allocator, cxxrtl_o_path, std.math.maxInt(usize)) catch |err|
+            std.debug.panic("couldn't read {s}: {}", .{ cxxrtl_o_path, err });
+        design_digest.update(contents);
+    }
+
+    // ... and on the harness that wrote them, since it serialises its own
+    // state alongside the design's.
+    var harness_digest = std.crypto.hash.sha2.Sha256.init(.{});
+    {
+        var src_dir = b.build_root.handle.openDir("src", .{ .iterate = true }) catch |err|
+            std.debug.panic("couldn't open src: {}", .{err});
+        defer src_dir.close();
+
+        var names = std.ArrayList([]const u8).init(b.allocator);
+        var it = src_dir.iterate();
+        while (it.next() catch |err| std.debug.panic("couldn't list src: {}", .{err})) |e| {
+            if (e.kind == .file and std.mem.endsWith(u8, e.name, ".zig"))
+                names.append(b.dupe(e.name)) catch @panic("OOM");
+        }
+        std.mem.sort([]const u8, names.items, {}, struct {
+            fn lessThan(_: void, lhs: []const u8, rhs: []const u8) bool {
+                return std.mem.lessThan(u8, lhs, rhs);
+            }
+        }.lessThan);
+
+        for (names.items) |name| {
+            const contents = src_dir.readFileAlloc(b.allocator, name, std.math.maxInt(usize)) catch |err|
+                std.debug.panic("couldn't read src/{s}: {}", .{ name, err });
+            harness_digest.update(name);
+            harness_digest.update(contents);
+        }
     }
 
     const options = b.addOptions();
     options.addOption(usize, "clock_hz", clock_hz);
+    options.addOption([]const u8, "design_digest", &std.fmt.bytesToHex(design_digest.finalResult(), .lower));
+    options.addOption([]const u8, "harness_digest", &std.fmt.bytesToHex(harness_digest.finalResult(), .lower));
     exe.root_module.addOptions("options", options);
 
     b.installArtifact(exe);
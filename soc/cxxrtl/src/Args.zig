@@ -5,17 +5,27 @@ const Args = @This();
 allocator: std.mem.Allocator,
 vcd: ?[]const u8,
 uart: ?[]const u8,
+snapshot: ?[]const u8,
+snapshot_at: ?usize,
+snapshot_after: ?usize,
+restore: bool,
+checked_frames: bool,
 
 pub fn parse(allocator: std.mem.Allocator) !Args {
     var vcd: ?[]const u8 = null;
     var uart: ?[]const u8 = null;
+    var snapshot: ?[]const u8 = null;
+    var snapshot_at: ?usize = null;
+    var snapshot_after: ?usize = null;
+    var restore = false;
+    var checked_frames = false;
 
     var argv = try std.process.argsWithAllocator(allocator);
     defer argv.deinit();
 
     _ = argv.next();
 
-    var arg_state: enum { root, vcd, uart } = .root;
+    var arg_state: enum { root, vcd, uart, snapshot, snapshot_at, snapshot_after } = .root;
     while (argv.next()) |arg| {
         switch (arg_state) {
             .root => {
@@ -23,6 +33,16 @@ pub fn parse(allocator: std.mem.Allocator) !Args {
                     arg_state = .vcd
                 else if (std.mem.eql(u8, arg, "--uart"))
                     arg_state = .uart
+                else if (std.mem.eql(u8, arg, "--snapshot"))
+                    arg_state = .snapshot
+                else if (std.mem.eql(u8, arg, "--snapshot-at"))
+                    arg_state = .snapshot_at
+                else if (std.mem.eql(u8, arg, "--snapshot-after"))
+                    arg_state = .snapshot_after
+                else if (std.mem.eql(u8, arg, "--restore"))
+                    restore = true
+                else if (std.mem.eql(u8, arg, "--checked-frames"))
+                    checked_frames = true
                 else
                     std.debug.panic("unknown argument: \"{s}\"", .{arg});
             },
@@ -34,22 +54,45 @@ pub fn parse(allocator: std.mem.Allocator) !Args {
                 uart = arg;
                 arg_state = .root;
             },
+            .snapshot => {
+                snapshot = arg;
+                arg_state = .root;
+            },
+            .snapshot_at => {
+                snapshot_at = std.fmt.parseInt(usize, arg, 10) catch
+                    std.debug.panic("invalid tick number for --snapshot-at: \"{s}\"", .{arg});
+                arg_state = .root;
+            },
+            .snapshot_after => {
+                snapshot_after = std.fmt.parseInt(usize, arg, 10) catch
+                    std.debug.panic("invalid event count for --snapshot-after: \"{s}\"", .{arg});
+                arg_state = .root;
+            },
         }
     }
     switch (arg_state) {
         .root => {},
         .vcd => std.debug.panic("missing argument for --vcd", .{}),
         .uart => std.debug.panic("missing argument for --uart", .{}),
+        .snapshot => std.debug.panic("missing argument for --snapshot", .{}),
+        .snapshot_at => std.debug.panic("missing argument for --snapshot-at", .{}),
+        .snapshot_after => std.debug.panic("missing argument for --snapshot-after", .{}),
     }
 
     return .{
         .allocator = allocator,
         .vcd = if (vcd) |m| try allocator.dupe(u8, m) else null,
         .uart = if (uart) |m| try allocator.dupe(u8, m) else null,
+        .snapshot = if (snapshot) |m| try allocator.dupe(u8, m) else null,
+        .snapshot_at = snapshot_at,
+        .snapshot_after = snapshot_after,
+        .restore = restore,
+        .checked_frames = checked_frames,
     };
 }
 
 pub fn deinit(self: *Args) void {
+    if (self.snapshot) |m| self.allocator.free(m);
     if (self.uart) |m| self.allocator.free(m);
     if (self.vcd) |m| self.allocator.free(m);
 }
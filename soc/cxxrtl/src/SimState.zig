@@ -5,6 +5,7 @@ const proto = @import("avacore").proto;
 
 const UartConnector = @import("./UartConnector.zig");
 const SpiFlashConnector = @import("./SpiFlashConnector.zig");
+const Snapshot = @import("./Snapshot.zig");
 
 const SimState = @This();
 
@@ -22,6 +23,38 @@ running: Cxxrtl.Object(bool),
 spi_flash_connector: SpiFlashConnector,
 uart_connector: UartConnector,
 
+// Set to take a snapshot during run(), once the core has sent this many
+// events and the UART is idle.
+snapshot_after: ?usize = null,
+snapshot_path: []const u8 = "",
+events: EventCounter = .{},
+
+// Counts the core's event frames (see core/src/frame.zig) as they go by.
+// Checked frames have a 4-byte trailer.
+const EventCounter = struct {
+    count: usize = 0,
+    trailer_len: u32 = 0,
+    header: [2]u8 = undefined,
+    header_len: u2 = 0,
+    body_left: u32 = 0,
+
+    fn feed(self: *EventCounter, b: u8) void {
+        if (self.body_left > 0) {
+            self.body_left -= 1;
+            if (self.body_left == 0) self.count += 1;
+            return;
+        }
+
+        self.header[self.header_len] = b;
+        self.header_len += 1;
+        if (self.header_len == 2) {
+            self.header_len = 0;
+            self.body_left = @as(u32, std.mem.readInt(u16, &self.header, .little)) + self.trailer_len;
+            if (self.body_left == 0) self.count += 1;
+        }
+    }
+};
+
 pub fn init(allocator: Allocator, aborted: *std.atomic.Value(bool), vcd_path: ?[]const u8) SimState {
     const cxxrtl = Cxxrtl.init();
 
@@ -56,16 +89,21 @@ pub fn deinit(self: *SimState) void {
 
 pub fn run(self: *SimState, uart_stream: std.net.Stream) !void {
     while (!self.aborted.load(.acquire)) {
-        self.tick();
-
-        self.spi_flash_connector.tick();
-
-        switch (self.uart_connector.tick()) {
+        switch (self.cycle()) {
             .nop => {},
-            .data => |b| try uart_stream.writer().writeByte(b),
+            .data => |b| {
+                try uart_stream.writer().writeByte(b);
+                self.events.feed(b);
+            },
         }
 
-        self.tick();
+        if (self.snapshot_after) |n| {
+            if (self.events.count >= n and self.uart_connector.idle()) {
+                try self.snapshot(self.snapshot_path);
+                std.debug.print("wrote snapshot '{s}' at tick number {d}\n", .{ self.snapshot_path, self.tick_number });
+                self.snapshot_after = null;
+            }
+        }
 
         if (uart_stream.reader().readByte()) |b| {
             try self.uart_connector.tx_buffer.append(b);
@@ -83,6 +121,30 @@ pub fn run(self: *SimState, uart_stream: std.net.Stream) !void {
     }
 }
 
+// Runs without a UART connection until at least tick_number, and until the
+// UART is idle so that a snapshot can be taken.
+pub fn runUntil(self: *SimState, tick_number: usize) void {
+    while (!self.aborted.load(.acquire) and
+        (self.tick_number < tick_number or !self.uart_connector.idle()))
+    {
+        switch (self.cycle()) {
+            .nop => {},
+            .data => |b| std.debug.print("dropping UART byte {x:0>2} with no connection\n", .{b}),
+        }
+
+        if (!self.running.curr())
+            self.aborted.store(true, .release);
+    }
+}
+
+fn cycle(self: *SimState) UartConnector.Tick {
+    self.tick();
+    self.spi_flash_connector.tick();
+    const result = self.uart_connector.tick();
+    self.tick();
+    return result;
+}
+
 fn tick(self: *SimState) void {
     self.clk.next(!self.clk.curr());
     self.cxxrtl.step();
@@ -102,3 +164,43 @@ pub fn writeVcd(self: *SimState) !void {
         try file.writeAll(buffer);
     }
 }
+
+pub fn snapshot(self: *SimState, path: []const u8) !void {
+    std.debug.assert(self.uart_connector.idle());
+
+    // Written atomically, so concurrent runs restoring from the same path
+    // never see a partial snapshot.
+    var file = try std.fs.cwd().atomicFile(path, .{});
+    defer file.deinit();
+
+    var bw = std.io.bufferedWriter(file.file.writer());
+    const writer = bw.writer();
+
+    try writer.writeAll(Snapshot.MAGIC);
+    try writer.writeAll(&Snapshot.key());
+    try writer.writeInt(u64, self.tick_number, .little);
+    try self.spi_flash_connector.save(writer);
+    try Snapshot.saveDesign(self.allocator, self.cxxrtl, writer);
+
+    try bw.flush();
+    try file.finish();
+}
+
+// Fails with error.StaleSnapshot without touching any state if the snapshot
+// was taken from a different design or firmware.
+pub fn restore(self: *SimState, path: []const u8) !void {
+    var file = try std.fs.cwd().openFile(path, .{});
+    defer file.close();
+
+    var br = std.io.bufferedReader(file.reader());
+    const reader = br.reader();
+
+    if (!std.mem.eql(u8, &try reader.readBytesNoEof(Snapshot.MAGIC.len), Snapshot.MAGIC))
+        return error.InvalidSnapshot;
+    if (!std.mem.eql(u8, &try reader.readBytesNoEof(32), &Snapshot.key()))
+        return error.StaleSnapshot;
+
+    self.tick_number = @intCast(try reader.readInt(u64, .little));
+    try self.spi_flash_connector.load(reader);
+    try Snapshot.loadDesign(self.allocator, self.cxxrtl, reader);
+}
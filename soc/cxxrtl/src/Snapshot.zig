@@ -0,0 +1,120 @@
+const std = @import("std");
+const Allocator = std.mem.Allocator;
+const options = @import("options");
+const Cxxrtl = @import("zxxrtl");
+
+const SpiFlashConnector = @import("./SpiFlashConnector.zig");
+
+pub const MAGIC = "AVASNAP1";
+
+// struct cxxrtl_object, per cxxrtl_capi.h.
+const Object = extern struct {
+    type: u32,
+    flags: u32,
+    width: usize,
+    lsb_at: usize,
+    depth: usize,
+    zero_at: usize,
+    curr: ?[*]u32,
+    next: ?[*]u32,
+    outline: ?*anyopaque,
+    attrs: ?*anyopaque,
+};
+
+const CXXRTL_VALUE = 0;
+const CXXRTL_WIRE = 1;
+const CXXRTL_MEMORY = 2;
+
+const CXXRTL_INPUT = 1 << 0;
+
+extern fn cxxrtl_enum(
+    handle: ?*anyopaque,
+    data: ?*anyopaque,
+    callback: *const fn (data: ?*anyopaque, name: [*:0]const u8, object: [*]Object, parts: usize) callconv(.C) void,
+) void;
+
+const Chunks = struct {
+    curr: []u32,
+    next: ?[]u32,
+};
+
+// Identifies the build a snapshot was taken from: digests of the design's
+// object files and of the harness source (computed by build.zig), and the
+// firmware image.
+pub fn key() [32]u8 {
+    var hasher = std.crypto.hash.sha2.Sha256.init(.{});
+    hasher.update(options.design_digest);
+    hasher.update(options.harness_digest);
+    hasher.update(SpiFlashConnector.ROM);
+    return hasher.finalResult();
+}
+
+pub fn saveDesign(allocator: Allocator, cxxrtl: Cxxrtl, writer: anytype) !void {
+    const chunks = try collect(allocator, cxxrtl);
+    defer allocator.free(chunks);
+
+    try writer.writeInt(u32, @intCast(chunks.len), .little);
+    for (chunks) |c| {
+        try writer.writeInt(u32, @intCast(c.curr.len), .little);
+        try writer.writeAll(std.mem.sliceAsBytes(c.curr));
+        if (c.next) |next|
+            try writer.writeAll(std.mem.sliceAsBytes(next));
+    }
+}
+
+pub fn loadDesign(allocator: Allocator, cxxrtl: Cxxrtl, reader: anytype) !void {
+    const chunks = try collect(allocator, cxxrtl);
+    defer allocator.free(chunks);
+
+    if (try reader.readInt(u32, .little) != chunks.len)
+        return error.InvalidSnapshot;
+    for (chunks) |c| {
+        if (try reader.readInt(u32, .little) != c.curr.len)
+            return error.InvalidSnapshot;
+        try reader.readNoEof(std.mem.sliceAsBytes(c.curr));
+        if (c.next) |next|
+            try reader.readNoEof(std.mem.sliceAsBytes(next));
+    }
+}
+
+// Every wire, memory and input, in enumeration order. These hold all of the
+// design's state; other values are either constant or recomputed from wires on
+// each step. Top-level inputs are values, not wires, and the connectors only
+// drive them on a change, so they must be kept too.
+fn collect(allocator: Allocator, cxxrtl: Cxxrtl) ![]Chunks {
+    const Context = struct {
+        const Self = @This();
+
+        chunks: std.ArrayList(Chunks),
+        err: ?Allocator.Error = null,
+
+        fn callback(data: ?*anyopaque, name: [*:0]const u8, objects: [*]Object, parts: usize) callconv(.C) void {
+            _ = name;
+            const self: *Self = @ptrCast(@alignCast(data.?));
+            for (objects[0..parts]) |object| {
+                switch (object.type) {
+                    CXXRTL_WIRE, CXXRTL_MEMORY => {},
+                    CXXRTL_VALUE => if ((object.flags & CXXRTL_INPUT) == 0) continue,
+                    else => continue,
+                }
+                const len = (object.width + 31) / 32 * object.depth;
+                const curr = object.curr.?;
+                self.chunks.append(.{
+                    .curr = curr[0..len],
+                    // A value's next is its curr.
+                    .next = if (object.next) |next| (if (next == curr) null else next[0..len]) else null,
+                }) catch |err| {
+                    self.err = err;
+                };
+            }
+        }
+    };
+
+    var context = Context{ .chunks = std.ArrayList(Chunks).init(allocator) };
+    errdefer context.chunks.deinit();
+
+    cxxrtl_enum(@ptrCast(cxxrtl.handle), &context, &Context.callback);
+    if (context.err) |err| return err;
+
+    return context.chunks.toOwnedSlice();
+}
@@ -3,11 +3,9 @@ const Cxxrtl = @import("zxxrtl");
 
 const SpiFlashConnector = @This();
 
-const ROM = @embedFile("avacore.bin");
+pub const ROM = @embedFile("avacore.bin");
 const ROM_BASE = 0x0080_0000;
 
-const COUNTDOWN_BETWEEN_BYTES = 2;
-
 addr_stb_p: Cxxrtl.Object(u24),
 addr_stb_valid: Cxxrtl.Object(bool),
 addr_stb_ready: Cxxrtl.Object(bool),
@@ -16,10 +14,15 @@ stop_stb_ready: Cxxrtl.Object(bool),
 res_p: Cxxrtl.Object(u8),
 res_valid: Cxxrtl.Object(bool),
 
-state: enum { powerdown_release, cmd_wait, read },
+// Timing is chosen by the Python target and exported through the design.
+powerdown_cycles: Cxxrtl.Object(u8),
+command_cycles: Cxxrtl.Object(u8),
+byte_cycles: Cxxrtl.Object(u8),
+
+state: enum { init, powerdown_release, cmd_wait, read },
 stopping: bool,
 address: u24,
-countdown: u8,
+countdown: u16,
 
 pub fn init(cxxrtl: Cxxrtl) SpiFlashConnector {
     const addr_stb_p = cxxrtl.get(u24, "spifr_addr_stb_p");
@@ -29,6 +32,9 @@ pub fn init(cxxrtl: Cxxrtl) SpiFlashConnector {
     const stop_stb_ready = cxxrtl.get(bool, "spifr_stop_stb_ready");
     const res_p = cxxrtl.get(u8, "spifr_res_p");
     const res_valid = cxxrtl.get(bool, "spifr_res_valid");
+    const powerdown_cycles = cxxrtl.get(u8, "spifr_powerdown_cycles");
+    const command_cycles = cxxrtl.get(u8, "spifr_command_cycles");
+    const byte_cycles = cxxrtl.get(u8, "spifr_byte_cycles");
 
     return .{
         .addr_stb_p = addr_stb_p,
@@ -38,11 +44,14 @@ pub fn init(cxxrtl: Cxxrtl) SpiFlashConnector {
         .stop_stb_ready = stop_stb_ready,
         .res_p = res_p,
         .res_valid = res_valid,
+        .powerdown_cycles = powerdown_cycles,
+        .command_cycles = command_cycles,
+        .byte_cycles = byte_cycles,
 
-        .state = .powerdown_release,
+        .state = .init,
         .stopping = true,
         .address = 0,
-        .countdown = 8,
+        .countdown = 0,
     };
 }
 
@@ -55,7 +64,15 @@ pub fn tick(self: *SpiFlashConnector) void {
 
     self.res_valid.next(false);
 
+    if (self.state == .init) {
+        // The timing outputs are only valid once the design has been
+        // stepped, so we can't read them in init().
+        self.countdown = @max(1, self.powerdown_cycles.curr());
+        self.state = .powerdown_release;
+    }
+
     switch (self.state) {
+        .init => unreachable,
         .powerdown_release => {
             self.countdown -= 1;
             if (self.countdown == 0) {
@@ -75,20 +92,22 @@ pub fn tick(self: *SpiFlashConnector) void {
                     self.addr_stb_ready.next(false);
                     self.state = .read;
                     self.stopping = false;
-                    self.countdown = COUNTDOWN_BETWEEN_BYTES;
+                    self.countdown = @as(u16, self.command_cycles.curr()) + self.byte_cycles.curr();
                 }
             }
         },
         .read => {
             self.countdown -= 1;
             if (self.countdown == 0) {
-                self.countdown = COUNTDOWN_BETWEEN_BYTES;
+                self.countdown = self.byte_cycles.curr();
                 self.res_p.next(if (self.address - ROM_BASE < ROM.len) ROM[self.address - ROM_BASE] else 0xff);
                 self.res_valid.next(true);
 
                 self.address += 1;
 
-                if (self.stop_stb_valid.curr()) {
+                // As in SPIFlashReader, the stop is latched; the byte in flight
+                // when it arrived is the last one delivered.
+                if (self.stopping) {
                     // std.debug.print("SpiFlashConnector: stopping\n", .{});
                     self.addr_stb_ready.next(true);
                     self.state = .cmd_wait;
@@ -97,3 +116,17 @@ pub fn tick(self: *SpiFlashConnector) void {
         },
     }
 }
+
+pub fn save(self: *const SpiFlashConnector, writer: anytype) !void {
+    try writer.writeByte(@intFromEnum(self.state));
+    try writer.writeByte(@intFromBool(self.stopping));
+    try writer.writeInt(u24, self.address, .little);
+    try writer.writeInt(u16, self.countdown, .little);
+}
+
+pub fn load(self: *SpiFlashConnector, reader: anytype) !void {
+    self.state = @enumFromInt(try reader.readByte());
+    self.stopping = try reader.readByte() == 1;
+    self.address = try reader.readInt(u24, .little);
+    self.countdown = try reader.readInt(u16, .little);
+}
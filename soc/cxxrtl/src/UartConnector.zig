@@ -20,7 +20,7 @@ rx_timer: usize = 0,
 rx_sr: u10 = 0,
 rx_counter: u4 = 0,
 
-const Tick = union(enum) {
+pub const Tick = union(enum) {
     nop,
     data: u8,
 };
@@ -40,6 +40,12 @@ pub fn deinit(self: UartConnector) void {
     self.tx_buffer.deinit();
 }
 
+// Everything else is reset on leaving idle, so an idle connector is
+// indistinguishable from a fresh one.
+pub fn idle(self: *const UartConnector) bool {
+    return self.tx_state == .idle and self.tx_buffer.items.len == 0 and self.rx_state == .idle;
+}
+
 pub fn tick(self: *UartConnector) Tick {
     const rx = self.rx.tick();
 
@@ -25,12 +25,39 @@ pub fn main() !void {
     var sim_state = SimState.init(allocator, &aborted, args.vcd);
     defer sim_state.deinit();
 
+    const snapshot_path = args.snapshot orelse "cxxrtl-snapshot";
+
+    var restored = false;
+    if (args.restore) {
+        if (sim_state.restore(snapshot_path)) {
+            std.debug.print("restored snapshot '{s}' at tick number {d}\n", .{ snapshot_path, sim_state.tick_number });
+            restored = true;
+        } else |err| switch (err) {
+            error.FileNotFound, error.StaleSnapshot => std.debug.print("not restoring snapshot '{s}': {s}\n", .{ snapshot_path, @errorName(err) }),
+            else => return err,
+        }
+    }
+
     try std.posix.sigaction(std.posix.SIG.INT, &.{
         .handler = .{ .handler = sigint },
         .mask = std.posix.empty_sigset,
         .flags = 0,
     }, null);
 
+    if (!restored) {
+        if (args.snapshot_at) |snapshot_at| {
+            sim_state.runUntil(snapshot_at);
+            if (!aborted.load(.acquire)) {
+                try sim_state.snapshot(snapshot_path);
+                std.debug.print("wrote snapshot '{s}' at tick number {d}\n", .{ snapshot_path, sim_state.tick_number });
+            }
+        } else if (args.snapshot_after) |snapshot_after| {
+            sim_state.snapshot_after = snapshot_after;
+            sim_state.snapshot_path = snapshot_path;
+            if (args.checked_frames) sim_state.events.trailer_len = 4;
+        }
+    }
+
     while (!aborted.load(.acquire)) {
         std.debug.print("waiting for UART connection on '{s}' ... ", .{uart_socket_path});
         const socket_conn = socket_server.accept() catch |err| {
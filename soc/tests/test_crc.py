@@ -0,0 +1,164 @@
+import itertools
+import random
+import struct
+import zlib
+
+from amaranth import *
+from amaranth.sim import Simulator
+
+from avasoc.rtl.crc import WishboneCRC32
+from avasoc.rtl.uart import WishboneUART
+from avasoc.targets import test
+
+
+DATA = b"The quick brown fox jumps over the lazy dog"
+
+# CRC of any data followed by its own CRC.
+RESIDUE = 0x2144DF1C
+
+
+async def wb_write(ctx, bus, adr, dat, sel=0b1111):
+    ctx.set(bus.cyc, 1)
+    ctx.set(bus.stb, 1)
+    ctx.set(bus.we, 1)
+    ctx.set(bus.adr, adr)
+    ctx.set(bus.dat_w, dat)
+    ctx.set(bus.sel, sel)
+    await ctx.tick().until(bus.ack)
+    ctx.set(bus.cyc, 0)
+    ctx.set(bus.stb, 0)
+    await ctx.tick()
+
+
+async def wb_read(ctx, bus, adr, sel=0b1111):
+    ctx.set(bus.cyc, 1)
+    ctx.set(bus.stb, 1)
+    ctx.set(bus.we, 0)
+    ctx.set(bus.adr, adr)
+    ctx.set(bus.sel, sel)
+    (dat,) = await ctx.tick().sample(bus.dat_r).until(bus.ack)
+    ctx.set(bus.cyc, 0)
+    ctx.set(bus.stb, 0)
+    await ctx.tick()
+    return dat
+
+
+def test_data():
+    dut = WishboneCRC32()
+
+    async def bench(ctx):
+        await wb_write(ctx, dut.wb_bus, 0, 0)
+        assert await wb_read(ctx, dut.wb_bus, 0) == zlib.crc32(b"")
+
+        # Mix of word, halfword and byte writes, as a memcpy-like loop would do.
+        data = DATA
+        sels = itertools.cycle([0b1111, 0b0011, 0b0001, 0b1100, 0b0010])
+        while data:
+            sel = next(sels)
+            word = bytearray(4)
+            for lane in range(4):
+                if sel & (1 << lane):
+                    if data:
+                        word[lane], data = data[0], data[1:]
+                    else:
+                        sel &= ~(1 << lane)
+            await wb_write(ctx, dut.wb_bus, 1, struct.unpack("<L", word)[0], sel)
+
+        assert await wb_read(ctx, dut.wb_bus, 0) == zlib.crc32(DATA)
+
+        await wb_write(ctx, dut.wb_bus, 0, 0)
+        assert await wb_read(ctx, dut.wb_bus, 0) == zlib.crc32(b"")
+
+    sim = Simulator(Fragment.get(dut, test()))
+    sim.add_clock(1e-6)
+    sim.add_testbench(bench)
+    sim.run()
+
+
+def test_snoop():
+    dut = WishboneCRC32()
+
+    async def bench(ctx):
+        await wb_write(ctx, dut.wb_bus, 2, 0)
+        await wb_write(ctx, dut.wb_bus, 3, 0)
+
+        # A frame with its CRC appended on RX; just the frame on TX.
+        for b in DATA + struct.pack("<L", zlib.crc32(DATA)):
+            ctx.set(dut.rx.p, b)
+            ctx.set(dut.rx.valid, 1)
+            await ctx.tick()
+        ctx.set(dut.rx.valid, 0)
+
+        for b in DATA:
+            ctx.set(dut.tx.p, b)
+            ctx.set(dut.tx.valid, 1)
+            await ctx.tick()
+            # Gaps between bytes don't matter.
+            ctx.set(dut.tx.valid, 0)
+            await ctx.tick()
+
+        assert await wb_read(ctx, dut.wb_bus, 2) == RESIDUE
+        assert await wb_read(ctx, dut.wb_bus, 3) == zlib.crc32(DATA)
+
+    sim = Simulator(Fragment.get(dut, test()))
+    sim.add_clock(1e-6)
+    sim.add_testbench(bench)
+    sim.run()
+
+
+def test_uart():
+    m = Module()
+    m.submodules.uart = uart = WishboneUART(None, baud=1_500_000,
+                                            tx_fifo_depth=32, rx_fifo_depth=32)
+    m.submodules.crc = crc = WishboneCRC32()
+    crc.snoop(m, uart.uart)
+
+    rd, wr = uart.uart.rd, uart.uart.wr
+    rx_data = DATA + struct.pack("<L", zlib.crc32(DATA))
+    rng = random.Random(0)
+    written = bytearray()
+
+    async def host_rx(ctx):
+        for b in rx_data:
+            while rng.random() < 0.3:
+                await ctx.tick()
+            ctx.set(rd.p, b)
+            ctx.set(rd.valid, 1)
+            await ctx.tick().until(rd.ready)
+            ctx.set(rd.valid, 0)
+
+    async def host_tx(ctx):
+        while len(written) < len(DATA):
+            ctx.set(wr.ready, rng.random() < 0.5)
+            (_, _, valid, ready, p) = await ctx.tick().sample(wr.valid, wr.ready, wr.p)
+            if valid and ready:
+                written.append(p)
+
+    async def cpu(ctx):
+        await wb_write(ctx, crc.wb_bus, 2, 0)
+        await wb_write(ctx, crc.wb_bus, 3, 0)
+
+        # Blocking data reads mixed with polling status reads, as uart.zig does.
+        read = bytearray()
+        while len(read) < len(rx_data):
+            if rng.random() < 0.5:
+                read.append(await wb_read(ctx, uart.wb_bus, 0, 0b0001) & 0xFF)
+            else:
+                status = await wb_read(ctx, uart.wb_bus, 0, 0b0011)
+                if status & 0x100:
+                    read.append(status & 0xFF)
+        assert bytes(read) == rx_data
+        assert await wb_read(ctx, crc.wb_bus, 2) == RESIDUE
+
+        for b in DATA:
+            await wb_write(ctx, uart.wb_bus, 0, b, 0b0001)
+        assert await wb_read(ctx, crc.wb_bus, 3) == zlib.crc32(DATA)
+
+    sim = Simulator(Fragment.get(m, test()))
+    sim.add_clock(1e-6)
+    sim.add_testbench(host_rx)
+    sim.add_testbench(host_tx)
+    sim.add_testbench(cpu)
+    sim.run()
+
+    assert bytes(written) == DATA
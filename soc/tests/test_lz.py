@@ -0,0 +1,159 @@
+import itertools
+import random
+import struct
+
+from amaranth import *
+from amaranth.lib import wiring
+from amaranth.sim import Simulator
+
+from avasoc import lz
+from avasoc.rtl.imem import WishboneIMem
+from avasoc.rtl.lz import LZDecompressor, WishboneLZReader
+from avasoc.rtl.spifr import SPIFlashArbiter, SPIFlashReader
+from avasoc.targets import test
+
+from .test_crc import wb_read, wb_write
+from .test_spifr import spi_process
+
+
+# Long enough for copies to wrap around the window.
+TEXT = b"".join(
+    b"%d bottles of beer on the wall, %d bottles of beer.\n" % (n, n)
+    for n in range(40, 0, -1)
+) + b"\x00" * 100 + bytes(range(256))
+
+SHORT = b"abcabcabcabcabc, " * 5 + b"xyzzy"
+
+
+def flash_bytes(images):
+    data = {}
+    for start, image in images.items():
+        for i, b in enumerate(image):
+            data[start + i] = b
+    return data
+
+
+def test_reference():
+    for data in [b"", b"a", TEXT, SHORT, bytes(range(256)) * 3]:
+        assert lz.decompress(lz.compress(data)) == data
+    assert len(lz.compress(TEXT)) < len(TEXT) // 2
+
+
+def test_decompressor():
+    dut = LZDecompressor()
+    image = lz.compress(TEXT)
+    rng = random.Random(0)
+
+    async def feed(ctx):
+        for b in image:
+            ctx.set(dut.compressed.p, b)
+            ctx.set(dut.compressed.valid, 1)
+            await ctx.tick().until(dut.compressed.ready)
+            ctx.set(dut.compressed.valid, 0)
+            if rng.random() < 0.3:
+                await ctx.tick()
+
+    async def bench(ctx):
+        (length,) = await ctx.tick().sample(dut.length).until(dut.length_valid)
+        assert length == len(TEXT)
+
+        out = bytearray()
+        while len(out) < len(TEXT):
+            ctx.set(dut.decompressed.ready, rng.random() < 0.7)
+            (_, _, valid, ready, p) = await ctx.tick().sample(
+                dut.decompressed.valid, dut.decompressed.ready, dut.decompressed.p)
+            if valid and ready:
+                out.append(p)
+        ctx.set(dut.decompressed.ready, 0)
+        assert bytes(out) == TEXT
+
+        await ctx.tick().until(dut.done)
+
+    sim = Simulator(Fragment.get(dut, test()))
+    sim.add_clock(1e-6)
+    sim.add_testbench(feed)
+    sim.add_testbench(bench)
+    sim.run()
+
+
+async def read_image(ctx, bus, addr, expected):
+    await wb_write(ctx, bus, 0, addr)
+    assert await wb_read(ctx, bus, 1) == len(expected)
+
+    # Mix of word, halfword and byte reads, running past the end.
+    data = expected + b"\x00" * 8
+    sels = itertools.cycle([0b1111, 0b0011, 0b0001, 0b1100, 0b0010])
+    while data:
+        sel = next(sels)
+        word = bytearray(4)
+        for lane in range(4):
+            if sel & (1 << lane):
+                if data:
+                    word[lane], data = data[0], data[1:]
+                else:
+                    sel &= ~(1 << lane)
+        assert await wb_read(ctx, bus, 2, sel) == struct.unpack("<L", word)[0]
+
+
+def test_wb():
+    m = Module()
+
+    m.submodules.reader = reader = WishboneLZReader()
+    m.submodules.spifr = spifr = SPIFlashReader()
+    wiring.connect(m, wiring.flipped(spifr), reader.spifr_bus)
+
+    images = {0x10_0000: lz.compress(TEXT), 0x20_0003: lz.compress(SHORT)}
+
+    async def bench(ctx):
+        # Nothing started yet.
+        assert await wb_read(ctx, reader.wb_bus, 1) == 0
+        assert await wb_read(ctx, reader.wb_bus, 2) == 0
+
+        await read_image(ctx, reader.wb_bus, 0x10_0000, TEXT)
+
+        # Restart part way through an image.
+        await wb_write(ctx, reader.wb_bus, 0, 0x10_0000)
+        assert await wb_read(ctx, reader.wb_bus, 2) == struct.unpack("<L", TEXT[:4])[0]
+        await read_image(ctx, reader.wb_bus, 0x20_0003, SHORT)
+
+    sim = Simulator(Fragment.get(m, test()))
+    sim.add_clock(1e-6)
+    sim.add_testbench(bench)
+    sim.add_process(spi_process(spifr=spifr, data=flash_bytes(images)))
+    sim.run()
+
+
+def test_shared():
+    m = Module()
+
+    m.submodules.imem = imem = WishboneIMem(base=0)
+    m.submodules.reader = reader = WishboneLZReader()
+    m.submodules.arbiter = arbiter = SPIFlashArbiter(2)
+    wiring.connect(m, imem.spifr_bus, arbiter.ports[0])
+    wiring.connect(m, reader.spifr_bus, arbiter.ports[1])
+
+    m.submodules.spifr = spifr = SPIFlashReader()
+    wiring.connect(m, wiring.flipped(spifr), arbiter.bus)
+
+    code = bytes(range(64))
+    images = {0x00_0000: code, 0x10_0000: lz.compress(TEXT)}
+    fetching = True
+
+    async def fetch(ctx):
+        addr = 0
+        while fetching:
+            assert await wb_read(ctx, imem.wb_bus, addr >> 2) == \
+                struct.unpack("<L", code[addr:addr + 4])[0]
+            addr = (addr + 4) % len(code)
+
+    async def bench(ctx):
+        nonlocal fetching
+        await read_image(ctx, reader.wb_bus, 0x10_0000, TEXT)
+        fetching = False
+
+    sim = Simulator(Fragment.get(m, test()))
+    sim.add_clock(1e-6)
+    sim.add_testbench(fetch)
+    sim.add_testbench(bench)
+    sim.add_process(spi_process(spifr=spifr, data=flash_bytes(images)))
+    sim.run()
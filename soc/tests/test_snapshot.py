@@ -0,0 +1,31 @@
+import csv
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SOC = Path(__file__).parent.parent
+BUILD = SOC / "build" / "cxxrtl"
+SIMULATOR = BUILD / "avasoc"
+AVABASIC = SOC.parent / "basic" / "zig-out" / "bin" / "avabasic"
+PROGRAM = SOC.parent / "basic" / "src" / "test" / "ft.basic.bas"
+
+
+@pytest.mark.skipif(not (SIMULATOR.is_file() and AVABASIC.is_file()),
+                    reason="needs the simulator built with `cxxrtl -c`, and avabasic")
+def test_restore():
+    # The second run restores the snapshot the first takes after MACHINE_INIT,
+    # and has to fetch from flash again to run the program.
+    (BUILD / "simbatch.snapshot").unlink(missing_ok=True)
+
+    for expected in ["wrote snapshot", "restored snapshot"]:
+        subprocess.run([sys.executable, "-m", "avasoc", "simbatch", "-j", "1",
+                        "--timeout", "120", "--snapshot-after-init", str(PROGRAM)],
+                       cwd=SOC, check=True)
+        assert expected in (BUILD / "simbatch" / f"{PROGRAM.stem}.log").read_text()
+        with open(BUILD / "simbatch.csv", newline="") as f:
+            (row,) = csv.DictReader(f)
+        assert row["status"] == "ok"
+        assert row["output"] == "pass"
@@ -30,7 +30,7 @@ for start, elems in DATA.items():
         start += 1
 
 
-def spi_process(*, spifr):
+def spi_process(*, spifr, data=data_bytes):
     async def spi(ctx):
         state = SPIState.Powerdown
         cmd = 0
@@ -57,7 +57,7 @@ def spi_process(*, spifr):
                             assert (cmd >> 24) == 0x03
                             addr = cmd & 0x00FF_FFFF
                             print(f"spi_process: read at {addr:06x}")
-                            reading = data_bytes.get(addr, 0xFF)
+                            reading = data.get(addr, 0xFF)
                             bit = 7
                             state = SPIState.Data
 
@@ -71,7 +71,7 @@ def spi_process(*, spifr):
                     bit -= 1
                     if bit < 0:
                         addr += 1
-                        reading = data_bytes.get(addr, 0xFF)
+                        reading = data.get(addr, 0xFF)
                         bit = 7
     return spi
 